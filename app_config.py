@@ -0,0 +1,54 @@
+import os
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy.pool import NullPool, StaticPool
+import orjson
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Serialize jsonify() responses with orjson"""
+    
+    def dumps(self, obj, **kwargs):
+        option = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if kwargs.get('indent'):
+            option |= orjson.OPT_INDENT_2
+        
+        # OPT_NAIVE_UTC is deliberately left off: naive datetimes come out exactly as
+        # isoformat() without a '+00:00' offset, the format handlers sent before they
+        # passed datetimes through. Anything orjson doesn't know (e.g. Decimal) falls
+        # back to Flask's default conversion
+        return orjson.dumps(obj, default=self.default, option=option).decode('utf-8')
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+def engine_options(database_url):
+    """SQLAlchemy engine options for the configured database"""
+    if database_url.startswith('sqlite'):
+        # An in-memory database only exists on its one connection; share it across threads
+        if database_url in ('sqlite://', 'sqlite:///:memory:'):
+            return {'poolclass': StaticPool, 'connect_args': {'check_same_thread': False}}
+        # SQLite files are cheap to open, and pooled connections only hold locks longer
+        return {'poolclass': NullPool}
+    
+    # Connection pool for server databases; size it to gunicorn workers x threads
+    # so concurrent requests each get their own connection, and drop stale ones
+    return {
+        'pool_size': int(os.getenv('DB_POOL_SIZE', 10)),
+        'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', 20)),
+        'pool_pre_ping': True,
+        'pool_recycle': int(os.getenv('DB_POOL_RECYCLE', 1800))
+    }
+
+def configure_app(app):
+    """Shared setup for the API apps: orjson responses, and the database when DATABASE_URL is set"""
+    app.json = OrjsonProvider(app)
+    
+    database_url = os.getenv('DATABASE_URL', '')
+    if database_url:
+        # Imported here so the demo endpoints still run without a database configured
+        from src.models.user import db
+        
+        app.config['SQLALCHEMY_DATABASE_URI'] = database_url
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(database_url)
+        db.init_app(app)
@@ -1,14 +1,23 @@
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
 from datetime import datetime
 import json
 
 db = SQLAlchemy()
 
+class LowercaseString(db.TypeDecorator):
+    """String column that is always stored and compared in lowercase"""
+    impl = db.String
+    cache_ok = True
+    
+    def process_bind_param(self, value, dialect):
+        return value.lower() if value is not None else value
+
 class Website(db.Model):
     __tablename__ = 'websites'
     
     id = db.Column(db.Integer, primary_key=True)
-    domain = db.Column(db.String(255), unique=True, nullable=False)
+    domain = db.Column(LowercaseString(255), unique=True, nullable=False)
     title = db.Column(db.String(500))
     description = db.Column(db.Text)
     favicon_url = db.Column(db.String(500))
@@ -17,9 +26,30 @@ class Website(db.Model):
     total_audits = db.Column(db.Integer, default=0)
     average_score = db.Column(db.Numeric(5, 2))
     is_active = db.Column(db.Boolean, default=True)
+    # Validators from the last full fetch of the site's page, for conditional GETs
+    etag = db.Column(db.String(255))
+    last_modified = db.Column(db.String(64))
+    # Most recently created audit, kept current on insert so website lists can join it
+    # directly; use_alter breaks the websites <-> audits foreign key cycle on create_all
+    latest_audit_id = db.Column(
+        db.Integer, db.ForeignKey('audits.id', use_alter=True, ondelete='SET NULL')
+    )
+    
+    # Match the indexes in db/database_schema.sql; website lists are ordered (and
+    # keyset-paginated) by last analysis, newest first with NULLs last, with id as the
+    # tie-break. A plain DESC index is NULLS FIRST on PostgreSQL, so it needs its own;
+    # SQLite sorts NULLs lowest, so its DESC index already puts them last
+    __table_args__ = (
+        db.Index(
+            'idx_websites_last_analyzed', last_analyzed.desc().nulls_last(), id.desc()
+        ).ddl_if(dialect='postgresql'),
+        db.Index('idx_websites_last_analyzed', last_analyzed.desc(), id.desc()).ddl_if(dialect='sqlite'),
+    )
     
     # Relationships
-    audits = db.relationship('Audit', backref='website', lazy=True, cascade='all, delete-orphan')
+    audits = db.relationship(
+        'Audit', backref='website', lazy=True, cascade='all, delete-orphan', foreign_keys='Audit.website_id'
+    )
     backlinks = db.relationship('Backlink', backref='website', lazy=True, cascade='all, delete-orphan')
     social_profiles = db.relationship('SocialProfile', backref='website', lazy=True, cascade='all, delete-orphan')
 
@@ -40,6 +70,21 @@ class Audit(db.Model):
     ip_address = db.Column(db.String(45))
     is_public = db.Column(db.Boolean, default=False)
     
+    # Match the indexes in db/database_schema.sql. Audits are filtered by user and
+    # status, and listed per website newest first with NULLs last: the composite index
+    # serves the per-website pages without a sort (NULLS LAST spelled out for PostgreSQL,
+    # as for idx_websites_last_analyzed)
+    __table_args__ = (
+        db.Index('idx_audits_user_id', user_id),
+        db.Index('idx_audits_website_id', website_id),
+        db.Index('idx_audits_status', status),
+        db.Index('idx_audits_created_at', started_at),
+        db.Index(
+            'idx_audits_website_started', website_id, started_at.desc().nulls_last(), id.desc()
+        ).ddl_if(dialect='postgresql'),
+        db.Index('idx_audits_website_started', website_id, started_at.desc(), id.desc()).ddl_if(dialect='sqlite'),
+    )
+    
     # Relationships
     audit_details = db.relationship('AuditDetail', backref='audit', lazy=True, cascade='all, delete-orphan')
     seo_metrics = db.relationship('SEOMetrics', backref='audit', uselist=False, cascade='all, delete-orphan')
@@ -47,6 +92,14 @@ class Audit(db.Model):
     security_scans = db.relationship('SecurityScan', backref='audit', uselist=False, cascade='all, delete-orphan')
     reports = db.relationship('Report', backref='audit', lazy=True, cascade='all, delete-orphan')
 
+@event.listens_for(Audit, 'after_insert')
+def _set_latest_audit(mapper, connection, audit):
+    """Point the audit's website at it as its latest audit, in the same flush"""
+    websites = Website.__table__
+    connection.execute(
+        websites.update().where(websites.c.id == audit.website_id).values(latest_audit_id=audit.id)
+    )
+
 class AuditDetail(db.Model):
     __tablename__ = 'audit_details'
     
@@ -190,6 +243,19 @@ class SocialProfile(db.Model):
     verified = db.Column(db.Boolean, default=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    # Match the indexes in db/database_schema.sql; the social endpoints filter
+    # by website/platform and list by followers or most recently updated
+    __table_args__ = (
+        db.Index('idx_social_profiles_website_id', website_id),
+        db.Index('idx_social_profiles_platform', platform),
+        db.Index(
+            'idx_social_profiles_followers_count', followers_count.desc(),
+            postgresql_where=followers_count.isnot(None),
+            sqlite_where=followers_count.isnot(None)
+        ),
+        db.Index('idx_social_profiles_updated_at', updated_at.desc()),
+    )
 
 class SecurityScan(db.Model):
     __tablename__ = 'security_scans'
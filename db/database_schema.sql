@@ -52,7 +52,10 @@ CREATE TABLE websites (
     last_analyzed TIMESTAMP,
     total_audits INTEGER DEFAULT 0,
     average_score DECIMAL(5,2),
-    is_active BOOLEAN DEFAULT TRUE
+    is_active BOOLEAN DEFAULT TRUE,
+    etag VARCHAR(255),
+    last_modified VARCHAR(64),
+    latest_audit_id INTEGER REFERENCES audits(id) ON DELETE SET NULL
 );
 
 -- Main audits table for tracking analysis requests
@@ -298,6 +301,10 @@ CREATE INDEX idx_audits_user_id ON audits(user_id);
 CREATE INDEX idx_audits_website_id ON audits(website_id);
 CREATE INDEX idx_audits_status ON audits(status);
 CREATE INDEX idx_audits_created_at ON audits(started_at);
+-- SQLite sorts NULLs lowest, so these DESC indexes already match the lists' NULLS LAST
+-- ordering; PostgreSQL needs started_at / last_analyzed DESC NULLS LAST spelled out
+CREATE INDEX idx_audits_website_started ON audits(website_id, started_at DESC, id DESC);
+CREATE INDEX idx_websites_last_analyzed ON websites(last_analyzed DESC, id DESC);
 CREATE INDEX idx_audit_details_audit_id ON audit_details(audit_id);
 CREATE INDEX idx_audit_details_category ON audit_details(category);
 CREATE INDEX idx_backlinks_website_id ON backlinks(website_id);
@@ -305,6 +312,8 @@ CREATE INDEX idx_backlinks_source_domain ON backlinks(source_domain);
 CREATE INDEX idx_backlinks_status ON backlinks(status);
 CREATE INDEX idx_social_profiles_website_id ON social_profiles(website_id);
 CREATE INDEX idx_social_profiles_platform ON social_profiles(platform);
+CREATE INDEX idx_social_profiles_followers_count ON social_profiles(followers_count DESC) WHERE followers_count IS NOT NULL;
+CREATE INDEX idx_social_profiles_updated_at ON social_profiles(updated_at DESC);
 CREATE INDEX idx_reports_audit_id ON reports(audit_id);
 CREATE INDEX idx_reports_user_id ON reports(user_id);
 CREATE INDEX idx_subscriptions_user_id ON subscriptions(user_id);
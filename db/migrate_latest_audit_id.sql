@@ -0,0 +1,13 @@
+-- Add websites.latest_audit_id to an existing database and backfill it
+-- New audits keep it current (see the after_insert listener on Audit); run this once
+-- against databases created before the column existed. The UPDATE only fills rows
+-- that are still NULL, so it is safe to re-run on its own.
+
+ALTER TABLE websites ADD COLUMN latest_audit_id INTEGER REFERENCES audits(id) ON DELETE SET NULL;
+
+-- Point each website at its most recently inserted audit, as the listener does
+UPDATE websites
+SET latest_audit_id = (
+    SELECT MAX(audits.id) FROM audits WHERE audits.website_id = websites.id
+)
+WHERE latest_audit_id IS NULL;
@@ -0,0 +1,9 @@
+-- Rebuild the website and audit list indexes on PostgreSQL with NULLS LAST
+-- The lists sort by last_analyzed / started_at DESC NULLS LAST; a plain DESC index is
+-- NULLS FIRST there and can't serve that order. SQLite databases need no change.
+
+DROP INDEX IF EXISTS idx_websites_last_analyzed;
+CREATE INDEX idx_websites_last_analyzed ON websites (last_analyzed DESC NULLS LAST, id DESC);
+
+DROP INDEX IF EXISTS idx_audits_website_started;
+CREATE INDEX idx_audits_website_started ON audits (website_id, started_at DESC NULLS LAST, id DESC);
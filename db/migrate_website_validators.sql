@@ -0,0 +1,7 @@
+-- Add websites.etag and websites.last_modified to an existing database
+-- Run this once against databases created before the columns existed; the Website
+-- model, the social analysis and the website list ETags all read them. Both start
+-- out NULL and are filled in by the next social analysis of each website.
+
+ALTER TABLE websites ADD COLUMN etag VARCHAR(255);
+ALTER TABLE websites ADD COLUMN last_modified VARCHAR(64);
@@ -1,56 +1,245 @@
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from bs4 import BeautifulSoup, SoupStrainer
+from lxml import etree, html as lxml_html
 from urllib.parse import urljoin, urlparse
 import ssl
 import socket
 import time
 import re
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from datetime import datetime
+from typing import Optional
 import json
+from src.services.cache_service import cache
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# JSON-LD blobs on product pages can run to hundreds of KB; parse them in C when we can
+_json_loads = orjson.loads if orjson else json.loads
+
+# robots.txt, sitemap and certificate results are per host and rarely change
+HOST_PROBE_TTL = 300
+
+# Every signal we score lives in <head> or early in <body>; don't read or parse more than this
+MAX_CONTENT_BYTES = 5 * 1024 * 1024
+
+# Compiled once per process; evaluated by libxml2 instead of walking the soup
+_XP_H1 = etree.XPath('//h1')
+_XP_H2 = etree.XPath('//h2')
+_XP_H3 = etree.XPath('//h3')
+_XP_IMG_COUNT = etree.XPath('count(//img)')
+_XP_IMG_NOALT = etree.XPath('count(//img[not(@alt) or @alt=""])')
+_XP_LINKS = etree.XPath('//a[@href]/@href')
+_XP_TITLE = etree.XPath('//title')
+_XP_META_AND_LINKS = etree.XPath('//meta | //link')
+_XP_MICRODATA_COUNT = etree.XPath('count(//*[@itemscope])')
+_XP_VISIBLE_TEXT = etree.XPath(
+    './/text()[not(ancestor::script or ancestor::style or ancestor::noscript or ancestor::template)]',
+    smart_strings=False
+)
+
+# The soup is only queried for JSON-LD scripts, so don't build nodes for anything else
+_SOUP_STRAINER = SoupStrainer('script')
+
+_WORD_RE = re.compile(r'\b\w+\b')
+
+# Score ladders: the value is bucketed against the bounds with bisect and the
+# matching row is (status, score, max_score, message, recommendation, priority).
+_LOAD_PENALTY_BOUNDS = (1000, 2000, 3000)
+_LOAD_PENALTIES = (0, 10, 20, 30)
+
+_TITLE_LENGTH_BOUNDS = (0, 60)
+_TITLE_LENGTH_ROWS = (
+    ('fail', 0, 10, 'Title tag is empty', 'Add a descriptive title tag to your page', 'high'),
+    ('pass', 10, 10, 'Title tag length is optimal ({} characters)', None, 'low'),
+    ('warning', 7, 10, 'Title tag is too long ({} characters)',
+     'Keep title tags under 60 characters for better display in search results', 'medium')
+)
+
+_META_DESC_LENGTH_BOUNDS = (0, 160)
+_META_DESC_LENGTH_ROWS = (
+    ('fail', 0, 10, 'Meta description is empty', 'Add a compelling meta description', 'high'),
+    ('pass', 10, 10, 'Meta description length is optimal ({} characters)', None, 'low'),
+    ('warning', 7, 10, 'Meta description is too long ({} characters)',
+     'Keep meta descriptions under 160 characters', 'medium')
+)
+
+_WORD_COUNT_BOUNDS = (300, 500)
+_WORD_COUNT_ROWS = (
+    ('warning', 3, 10, 'Content is quite short ({} words)',
+     'Consider adding more comprehensive content (aim for 300+ words)', 'medium'),
+    ('pass', 7, 10, 'Content length is adequate ({} words)', 'Consider expanding content for better SEO value', 'low'),
+    ('pass', 10, 10, 'Content length is good ({} words)', None, 'low')
+)
+
+_LOAD_TIME_BOUNDS = (1000, 3000)
+_LOAD_TIME_ROWS = (
+    ('pass', 10, 10, 'Page loads quickly ({}ms)', None, 'low'),
+    ('warning', 7, 10, 'Page load time is acceptable ({}ms)',
+     'Consider optimizing images and scripts to improve load time', 'medium'),
+    ('fail', 3, 10, 'Page loads slowly ({}ms)', 'Optimize images, enable compression, and minimize scripts', 'high')
+)
+
+def read_capped_content(response):
+    """Read a streamed response body up to MAX_CONTENT_BYTES, returning (content, truncated)"""
+    chunks = []
+    received = 0
+    try:
+        for chunk in response.iter_content(chunk_size=64 * 1024):
+            chunks.append(chunk)
+            received += len(chunk)
+            if received > MAX_CONTENT_BYTES:
+                break
+    finally:
+        response.close()
+    
+    content = b''.join(chunks)
+    return content[:MAX_CONTENT_BYTES], received > MAX_CONTENT_BYTES
+
+@dataclass(slots=True)
+class Check:
+    """Result of a single scored check"""
+    status: str
+    score: int
+    max_score: int
+    message: str
+    recommendation: Optional[str]
+    priority: str
+    
+    @classmethod
+    def from_row(cls, row, value):
+        """Build a check from a score ladder row, filling the value into its message"""
+        status, score, max_score, message, recommendation, priority = row
+        return cls(status, score, max_score, message.format(value), recommendation, priority)
+    
+    def to_dict(self):
+        """Convert to dictionary for JSON serialization"""
+        return {
+            'status': self.status,
+            'score': self.score,
+            'max_score': self.max_score,
+            'message': self.message,
+            'recommendation': self.recommendation,
+            'priority': self.priority
+        }
+
+@dataclass(slots=True)
+class MetaInfo:
+    """Values read from the page's <meta> and <link> tags"""
+    description: Optional[str] = None
+    viewport: bool = False
+    canonical_url: Optional[str] = None
+    open_graph: dict = field(default_factory=dict)
+    twitter: dict = field(default_factory=dict)
 
 class SEOAnalyzer:
+    __slots__ = ('session', 'timeout')
+    
     def __init__(self):
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         })
+        
+        # Keep connections to each host alive across the page fetch and probes,
+        # and retry transient connection failures
+        adapter = HTTPAdapter(
+            pool_connections=50,
+            pool_maxsize=50,
+            max_retries=Retry(total=2, backoff_factor=0.2)
+        )
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
         self.timeout = 30
     
     def analyze_website(self, url):
         """Perform comprehensive SEO analysis of a website"""
         start_time = time.time()
         
+        # robots.txt and sitemap lookups don't depend on the page,
+        # so run them while the page itself is being fetched
+        executor = ThreadPoolExecutor(max_workers=3)
         try:
+            robots_probe = self._start_host_probe(executor, 'robots_txt', url, self._check_robots_txt)
+            sitemap_probe = self._start_host_probe(executor, 'sitemap', url, self._check_sitemap)
+            
             # Fetch the webpage
-            response = self.session.get(url, timeout=self.timeout, allow_redirects=True)
+            response = self.session.get(url, timeout=self.timeout, allow_redirects=True, stream=True)
             response.raise_for_status()
             
+            # The page's own TLS connection already has the certificate; only open
+            # a separate handshake if it can't be read from there
+            ssl_certificate = self._get_response_certificate(response) if url.startswith('https://') else None
+            ssl_probe = self._start_host_probe(
+                executor, 'ssl_certificate', url, self._get_ssl_certificate
+            ) if url.startswith('https://') and ssl_certificate is None else None
+            
+            content, content_truncated = read_capped_content(response)
+            
+            # Report the real size when the body was cut short and the server told us
+            content_length = response.headers.get('content-length', '')
+            if content_truncated and content_length.isdigit():
+                page_size_bytes = int(content_length)
+            else:
+                page_size_bytes = len(content)
+            
             # Parse HTML
-            soup = BeautifulSoup(response.content, 'html.parser')
+            soup = BeautifulSoup(content, 'lxml', parse_only=_SOUP_STRAINER)
+            try:
+                tree = lxml_html.fromstring(content)
+            except etree.ParserError:
+                # An empty or whitespace-only 200 body; score it as a page with no elements
+                tree = lxml_html.Element('html')
             
             # Calculate load time
             load_time_ms = int((time.time() - start_time) * 1000)
             
+            # Score everything that only needs the page first, so the probes
+            # still in flight finish behind CPU work instead of in front of it
+            signals = self._collect_dom_signals(tree)
+            performance_metrics = self._analyze_performance(url, response, load_time_ms)
+            seo_checks = self._check_seo_factors(signals)
+            content_checks = self._check_content_factors(signals)
+            performance_checks = self._check_performance_factors(response, load_time_ms)
+            mobile_checks = self._check_mobile_factors(signals)
+            
+            robots_txt_exists = self._finish_host_probe(robots_probe)
+            sitemap_exists = self._finish_host_probe(sitemap_probe)
+            if ssl_probe:
+                ssl_certificate = self._finish_host_probe(ssl_probe)
+            
             # Perform all analysis checks
             analysis_result = {
                 'overall_score': 0,
-                'page_title': self._get_page_title(soup),
-                'meta_description': self._get_meta_description(soup),
-                'details': {},
-                'seo_metrics': self._analyze_seo_metrics(url, response, soup, load_time_ms),
-                'performance_metrics': self._analyze_performance(url, response, load_time_ms),
-                'security_scan': self._analyze_security(url, response)
+                'content_truncated': content_truncated,
+                'page_title': signals['title_text'],
+                'meta_description': signals['meta_desc_text'],
+                'details': {
+                    'seo': seo_checks,
+                    'technical': self._check_technical_factors(url, robots_txt_exists, sitemap_exists),
+                    'content': content_checks,
+                    'performance': performance_checks,
+                    'mobile': mobile_checks
+                },
+                'seo_metrics': self._analyze_seo_metrics(url, page_size_bytes, soup, tree, signals, load_time_ms,
+                                                         robots_txt_exists, sitemap_exists),
+                'performance_metrics': performance_metrics,
+                'security_scan': self._analyze_security(url, response, ssl_certificate)
             }
             
-            # Perform detailed checks
-            analysis_result['details']['seo'] = self._check_seo_factors(url, soup, response)
-            analysis_result['details']['technical'] = self._check_technical_factors(url, soup, response)
-            analysis_result['details']['content'] = self._check_content_factors(soup)
-            analysis_result['details']['performance'] = self._check_performance_factors(response, load_time_ms)
-            analysis_result['details']['mobile'] = self._check_mobile_factors(soup)
-            
             # Calculate overall score
             analysis_result['overall_score'] = self._calculate_overall_score(analysis_result['details'])
+            analysis_result['details'] = {
+                category: {check_name: check.to_dict() for check_name, check in checks.items()}
+                for category, checks in analysis_result['details'].items()
+            }
             
             return analysis_result
             
@@ -58,87 +247,108 @@ class SEOAnalyzer:
             raise Exception(f"Failed to fetch website: {str(e)}")
         except Exception as e:
             raise Exception(f"Analysis failed: {str(e)}")
+        finally:
+            # Don't hold up error responses waiting on probes that are no longer needed
+            executor.shutdown(wait=False)
     
-    def _get_page_title(self, soup):
+    def _get_page_title(self, tree):
         """Extract page title"""
-        title_tag = soup.find('title')
-        return title_tag.get_text().strip() if title_tag else None
-    
-    def _get_meta_description(self, soup):
-        """Extract meta description"""
-        meta_desc = soup.find('meta', attrs={'name': 'description'})
-        return meta_desc.get('content', '').strip() if meta_desc else None
+        title_tags = _XP_TITLE(tree)
+        return title_tags[0].text_content().strip() if title_tags else None
     
-    def _analyze_seo_metrics(self, url, response, soup, load_time_ms):
-        """Analyze SEO-specific metrics"""
-        # Extract heading tags
-        h1_tags = [h.get_text().strip() for h in soup.find_all('h1')]
-        h2_tags = [h.get_text().strip() for h in soup.find_all('h2')]
-        h3_tags = [h.get_text().strip() for h in soup.find_all('h3')]
+    def _scan_meta(self, tree):
+        """Read description, viewport, canonical and social tags in one pass over <meta> and <link>"""
+        meta_info = MetaInfo()
+        
+        for tag in _XP_META_AND_LINKS(tree):
+            if tag.tag == 'link':
+                if meta_info.canonical_url is None and tag.get('rel') == 'canonical' and tag.get('href') is not None:
+                    meta_info.canonical_url = tag.get('href')
+                continue
+            
+            name = tag.get('name')
+            if name is not None:
+                if name == 'description':
+                    if meta_info.description is None:
+                        meta_info.description = tag.get('content', '').strip()
+                elif name == 'viewport':
+                    meta_info.viewport = True
+                elif name.startswith('twitter:'):
+                    meta_info.twitter[name.replace('twitter:', '')] = tag.get('content', '')
+            
+            property_name = tag.get('property')
+            if property_name is not None and property_name.startswith('og:'):
+                meta_info.open_graph[property_name.replace('og:', '')] = tag.get('content', '')
         
-        # Count images and alt attributes
-        images = soup.find_all('img')
-        images_count = len(images)
-        images_without_alt = len([img for img in images if not img.get('alt')])
+        return meta_info
+    
+    def _collect_dom_signals(self, tree):
+        """Read every page value the metrics and checks score in a single place"""
+        meta_info = self._scan_meta(tree)
         
+        return {
+            'title_text': self._get_page_title(tree),
+            'meta_desc_text': meta_info.description,
+            'h1_tags': [h.text_content().strip() for h in _XP_H1(tree)],
+            'h2_tags': [h.text_content().strip() for h in _XP_H2(tree)],
+            'h3_tags': [h.text_content().strip() for h in _XP_H3(tree)],
+            'image_count': int(_XP_IMG_COUNT(tree)),
+            'images_without_alt': int(_XP_IMG_NOALT(tree)),
+            'viewport_present': meta_info.viewport,
+            'word_count': self._count_words(tree),
+            'canonical_url': meta_info.canonical_url,
+            'meta_info': meta_info
+        }
+    
+    def _analyze_seo_metrics(self, url, page_size_bytes, soup, tree, signals, load_time_ms,
+                             robots_txt_exists, sitemap_exists):
+        """Analyze SEO-specific metrics"""
         # Count links
         internal_links = 0
         external_links = 0
-        parsed_url = urlparse(url)
+        netloc = urlparse(url).netloc
+        own_roots = (f'http://{netloc}', f'https://{netloc}', f'//{netloc}')
+        # Require a separator after the host so example.com.other.net isn't counted as ours
+        own_prefixes = tuple(root + separator for root in own_roots for separator in '/?#')
         
-        for link in soup.find_all('a', href=True):
-            href = link['href']
-            if href.startswith('http'):
-                link_domain = urlparse(href).netloc
-                if link_domain == parsed_url.netloc:
-                    internal_links += 1
-                else:
-                    external_links += 1
+        for href in _XP_LINKS(tree):
+            if href.startswith(own_prefixes) or href in own_roots:
+                internal_links += 1
+            elif href.startswith(('http://', 'https://', '//')):
+                external_links += 1
             elif href.startswith('/'):
                 internal_links += 1
         
-        # Count words
-        text_content = soup.get_text()
-        word_count = len(re.findall(r'\b\w+\b', text_content))
-        
         # Page size
-        page_size_kb = len(response.content) / 1024
+        page_size_kb = page_size_bytes / 1024
         
         # Check SSL
         ssl_enabled = url.startswith('https://')
         
-        # Check robots.txt and sitemap
-        robots_txt_exists = self._check_robots_txt(url)
-        sitemap_exists = self._check_sitemap(url)
-        
-        # Get canonical URL
-        canonical_link = soup.find('link', rel='canonical')
-        canonical_url = canonical_link.get('href') if canonical_link else None
-        
         # Extract schema markup
-        schema_markup = self._extract_schema_markup(soup)
+        schema_markup = self._extract_schema_markup(soup, tree)
         
         # Extract social tags
-        social_tags = self._extract_social_tags(soup)
+        social_tags = self._extract_social_tags(signals['meta_info'])
         
         return {
-            'page_title': self._get_page_title(soup),
-            'meta_description': self._get_meta_description(soup),
-            'h1_tags': h1_tags,
-            'h2_tags': h2_tags,
-            'h3_tags': h3_tags,
-            'images_count': images_count,
-            'images_without_alt': images_without_alt,
+            'page_title': signals['title_text'],
+            'meta_description': signals['meta_desc_text'],
+            'h1_tags': signals['h1_tags'],
+            'h2_tags': signals['h2_tags'],
+            'h3_tags': signals['h3_tags'],
+            'images_count': signals['image_count'],
+            'images_without_alt': signals['images_without_alt'],
             'internal_links': internal_links,
             'external_links': external_links,
-            'word_count': word_count,
+            'word_count': signals['word_count'],
             'page_size_kb': round(page_size_kb, 2),
             'load_time_ms': load_time_ms,
-            'mobile_friendly': self._check_mobile_friendly(soup),
+            'mobile_friendly': signals['viewport_present'],
             'ssl_enabled': ssl_enabled,
             'robots_txt_exists': robots_txt_exists,
             'sitemap_exists': sitemap_exists,
-            'canonical_url': canonical_url,
+            'canonical_url': signals['canonical_url'],
             'schema_markup': schema_markup,
             'social_tags': social_tags
         }
@@ -149,12 +359,7 @@ class SEOAnalyzer:
         performance_score = 100
         
         # Penalize slow load times
-        if load_time_ms > 3000:
-            performance_score -= 30
-        elif load_time_ms > 2000:
-            performance_score -= 20
-        elif load_time_ms > 1000:
-            performance_score -= 10
+        performance_score -= _LOAD_PENALTIES[bisect_left(_LOAD_PENALTY_BOUNDS, load_time_ms)]
         
         # Check compression
         if 'gzip' not in response.headers.get('content-encoding', ''):
@@ -178,11 +383,10 @@ class SEOAnalyzer:
             'seo_score': 80  # Would need more detailed analysis
         }
     
-    def _analyze_security(self, url, response):
+    def _analyze_security(self, url, response, ssl_certificate):
         """Analyze security aspects"""
         security_score = 100
         ssl_grade = 'A'
-        ssl_certificate = {}
         blacklist_status = {}
         security_headers = {}
         vulnerabilities = {}
@@ -191,25 +395,9 @@ class SEOAnalyzer:
         if not url.startswith('https://'):
             security_score -= 50
             ssl_grade = 'F'
-        else:
-            # Get SSL certificate info
-            try:
-                hostname = urlparse(url).netloc
-                context = ssl.create_default_context()
-                with socket.create_connection((hostname, 443), timeout=10) as sock:
-                    with context.wrap_socket(sock, server_hostname=hostname) as ssock:
-                        cert = ssock.getpeercert()
-                        ssl_certificate = {
-                            'subject': dict(x[0] for x in cert['subject']),
-                            'issuer': dict(x[0] for x in cert['issuer']),
-                            'version': cert['version'],
-                            'serial_number': cert['serialNumber'],
-                            'not_before': cert['notBefore'],
-                            'not_after': cert['notAfter']
-                        }
-            except Exception:
-                security_score -= 20
-                ssl_grade = 'C'
+        elif ssl_certificate is None:
+            security_score -= 20
+            ssl_grade = 'C'
         
         # Check security headers
         headers_to_check = [
@@ -227,7 +415,7 @@ class SEOAnalyzer:
                 security_score -= 5
         
         return {
-            'ssl_certificate': ssl_certificate,
+            'ssl_certificate': ssl_certificate or {},
             'ssl_grade': ssl_grade,
             'ssl_expires_at': None,  # Would extract from certificate
             'malware_detected': False,  # Would need external service
@@ -237,259 +425,181 @@ class SEOAnalyzer:
             'security_score': max(0, security_score)
         }
     
-    def _check_seo_factors(self, url, soup, response):
+    def _check_seo_factors(self, signals):
         """Check SEO-related factors"""
         checks = {}
         
         # Title tag check
-        title = soup.find('title')
-        if title:
-            title_text = title.get_text().strip()
-            if len(title_text) == 0:
-                checks['title_tag'] = {
-                    'status': 'fail',
-                    'score': 0,
-                    'max_score': 10,
-                    'message': 'Title tag is empty',
-                    'recommendation': 'Add a descriptive title tag to your page',
-                    'priority': 'high'
-                }
-            elif len(title_text) > 60:
-                checks['title_tag'] = {
-                    'status': 'warning',
-                    'score': 7,
-                    'max_score': 10,
-                    'message': f'Title tag is too long ({len(title_text)} characters)',
-                    'recommendation': 'Keep title tags under 60 characters for better display in search results',
-                    'priority': 'medium'
-                }
-            else:
-                checks['title_tag'] = {
-                    'status': 'pass',
-                    'score': 10,
-                    'max_score': 10,
-                    'message': f'Title tag length is optimal ({len(title_text)} characters)',
-                    'recommendation': None,
-                    'priority': 'low'
-                }
+        title_text = signals['title_text']
+        if title_text is not None:
+            checks['title_tag'] = Check.from_row(
+                _TITLE_LENGTH_ROWS[bisect_left(_TITLE_LENGTH_BOUNDS, len(title_text))], len(title_text)
+            )
         else:
-            checks['title_tag'] = {
-                'status': 'fail',
-                'score': 0,
-                'max_score': 10,
-                'message': 'Title tag is missing',
-                'recommendation': 'Add a title tag to your page',
-                'priority': 'critical'
-            }
+            checks['title_tag'] = Check(
+                status='fail',
+                score=0,
+                max_score=10,
+                message='Title tag is missing',
+                recommendation='Add a title tag to your page',
+                priority='critical'
+            )
         
         # Meta description check
-        meta_desc = soup.find('meta', attrs={'name': 'description'})
-        if meta_desc:
-            desc_content = meta_desc.get('content', '').strip()
-            if len(desc_content) == 0:
-                checks['meta_description'] = {
-                    'status': 'fail',
-                    'score': 0,
-                    'max_score': 10,
-                    'message': 'Meta description is empty',
-                    'recommendation': 'Add a compelling meta description',
-                    'priority': 'high'
-                }
-            elif len(desc_content) > 160:
-                checks['meta_description'] = {
-                    'status': 'warning',
-                    'score': 7,
-                    'max_score': 10,
-                    'message': f'Meta description is too long ({len(desc_content)} characters)',
-                    'recommendation': 'Keep meta descriptions under 160 characters',
-                    'priority': 'medium'
-                }
-            else:
-                checks['meta_description'] = {
-                    'status': 'pass',
-                    'score': 10,
-                    'max_score': 10,
-                    'message': f'Meta description length is optimal ({len(desc_content)} characters)',
-                    'recommendation': None,
-                    'priority': 'low'
-                }
+        desc_content = signals['meta_desc_text']
+        if desc_content is not None:
+            checks['meta_description'] = Check.from_row(
+                _META_DESC_LENGTH_ROWS[bisect_left(_META_DESC_LENGTH_BOUNDS, len(desc_content))], len(desc_content)
+            )
         else:
-            checks['meta_description'] = {
-                'status': 'fail',
-                'score': 0,
-                'max_score': 10,
-                'message': 'Meta description is missing',
-                'recommendation': 'Add a meta description to improve click-through rates',
-                'priority': 'high'
-            }
+            checks['meta_description'] = Check(
+                status='fail',
+                score=0,
+                max_score=10,
+                message='Meta description is missing',
+                recommendation='Add a meta description to improve click-through rates',
+                priority='high'
+            )
         
         # H1 tag check
-        h1_tags = soup.find_all('h1')
-        if len(h1_tags) == 0:
-            checks['h1_tag'] = {
-                'status': 'fail',
-                'score': 0,
-                'max_score': 10,
-                'message': 'No H1 tag found',
-                'recommendation': 'Add an H1 tag to clearly define the main topic of your page',
-                'priority': 'high'
-            }
-        elif len(h1_tags) > 1:
-            checks['h1_tag'] = {
-                'status': 'warning',
-                'score': 5,
-                'max_score': 10,
-                'message': f'Multiple H1 tags found ({len(h1_tags)})',
-                'recommendation': 'Use only one H1 tag per page for better SEO',
-                'priority': 'medium'
-            }
+        h1_count = len(signals['h1_tags'])
+        if h1_count == 0:
+            checks['h1_tag'] = Check(
+                status='fail',
+                score=0,
+                max_score=10,
+                message='No H1 tag found',
+                recommendation='Add an H1 tag to clearly define the main topic of your page',
+                priority='high'
+            )
+        elif h1_count > 1:
+            checks['h1_tag'] = Check(
+                status='warning',
+                score=5,
+                max_score=10,
+                message=f'Multiple H1 tags found ({h1_count})',
+                recommendation='Use only one H1 tag per page for better SEO',
+                priority='medium'
+            )
         else:
-            checks['h1_tag'] = {
-                'status': 'pass',
-                'score': 10,
-                'max_score': 10,
-                'message': 'Single H1 tag found',
-                'recommendation': None,
-                'priority': 'low'
-            }
+            checks['h1_tag'] = Check(
+                status='pass',
+                score=10,
+                max_score=10,
+                message='Single H1 tag found',
+                recommendation=None,
+                priority='low'
+            )
         
         return checks
     
-    def _check_technical_factors(self, url, soup, response):
+    def _check_technical_factors(self, url, robots_exists, sitemap_exists):
         """Check technical SEO factors"""
         checks = {}
         
         # SSL check
         if url.startswith('https://'):
-            checks['ssl_certificate'] = {
-                'status': 'pass',
-                'score': 10,
-                'max_score': 10,
-                'message': 'SSL certificate is present',
-                'recommendation': None,
-                'priority': 'low'
-            }
+            checks['ssl_certificate'] = Check(
+                status='pass',
+                score=10,
+                max_score=10,
+                message='SSL certificate is present',
+                recommendation=None,
+                priority='low'
+            )
         else:
-            checks['ssl_certificate'] = {
-                'status': 'fail',
-                'score': 0,
-                'max_score': 10,
-                'message': 'No SSL certificate found',
-                'recommendation': 'Install an SSL certificate to secure your website',
-                'priority': 'critical'
-            }
+            checks['ssl_certificate'] = Check(
+                status='fail',
+                score=0,
+                max_score=10,
+                message='No SSL certificate found',
+                recommendation='Install an SSL certificate to secure your website',
+                priority='critical'
+            )
         
         # Robots.txt check
-        robots_exists = self._check_robots_txt(url)
         if robots_exists:
-            checks['robots_txt'] = {
-                'status': 'pass',
-                'score': 5,
-                'max_score': 5,
-                'message': 'Robots.txt file found',
-                'recommendation': None,
-                'priority': 'low'
-            }
+            checks['robots_txt'] = Check(
+                status='pass',
+                score=5,
+                max_score=5,
+                message='Robots.txt file found',
+                recommendation=None,
+                priority='low'
+            )
         else:
-            checks['robots_txt'] = {
-                'status': 'warning',
-                'score': 0,
-                'max_score': 5,
-                'message': 'Robots.txt file not found',
-                'recommendation': 'Create a robots.txt file to guide search engine crawlers',
-                'priority': 'medium'
-            }
+            checks['robots_txt'] = Check(
+                status='warning',
+                score=0,
+                max_score=5,
+                message='Robots.txt file not found',
+                recommendation='Create a robots.txt file to guide search engine crawlers',
+                priority='medium'
+            )
         
         # Sitemap check
-        sitemap_exists = self._check_sitemap(url)
         if sitemap_exists:
-            checks['xml_sitemap'] = {
-                'status': 'pass',
-                'score': 5,
-                'max_score': 5,
-                'message': 'XML sitemap found',
-                'recommendation': None,
-                'priority': 'low'
-            }
+            checks['xml_sitemap'] = Check(
+                status='pass',
+                score=5,
+                max_score=5,
+                message='XML sitemap found',
+                recommendation=None,
+                priority='low'
+            )
         else:
-            checks['xml_sitemap'] = {
-                'status': 'warning',
-                'score': 0,
-                'max_score': 5,
-                'message': 'XML sitemap not found',
-                'recommendation': 'Create an XML sitemap to help search engines index your content',
-                'priority': 'medium'
-            }
+            checks['xml_sitemap'] = Check(
+                status='warning',
+                score=0,
+                max_score=5,
+                message='XML sitemap not found',
+                recommendation='Create an XML sitemap to help search engines index your content',
+                priority='medium'
+            )
         
         return checks
     
-    def _check_content_factors(self, soup):
+    def _check_content_factors(self, signals):
         """Check content-related factors"""
         checks = {}
         
         # Image alt attributes
-        images = soup.find_all('img')
-        images_without_alt = [img for img in images if not img.get('alt')]
-        
-        if len(images) == 0:
-            checks['image_alt_attributes'] = {
-                'status': 'info',
-                'score': 5,
-                'max_score': 5,
-                'message': 'No images found on page',
-                'recommendation': None,
-                'priority': 'low'
-            }
-        elif len(images_without_alt) == 0:
-            checks['image_alt_attributes'] = {
-                'status': 'pass',
-                'score': 10,
-                'max_score': 10,
-                'message': 'All images have alt attributes',
-                'recommendation': None,
-                'priority': 'low'
-            }
+        images_count = signals['image_count']
+        images_without_alt = signals['images_without_alt']
+        
+        if images_count == 0:
+            checks['image_alt_attributes'] = Check(
+                status='info',
+                score=5,
+                max_score=5,
+                message='No images found on page',
+                recommendation=None,
+                priority='low'
+            )
+        elif images_without_alt == 0:
+            checks['image_alt_attributes'] = Check(
+                status='pass',
+                score=10,
+                max_score=10,
+                message='All images have alt attributes',
+                recommendation=None,
+                priority='low'
+            )
         else:
-            checks['image_alt_attributes'] = {
-                'status': 'warning',
-                'score': 5,
-                'max_score': 10,
-                'message': f'{len(images_without_alt)} out of {len(images)} images missing alt attributes',
-                'recommendation': 'Add descriptive alt attributes to all images for better accessibility and SEO',
-                'priority': 'medium'
-            }
+            checks['image_alt_attributes'] = Check(
+                status='warning',
+                score=5,
+                max_score=10,
+                message=f'{images_without_alt} out of {images_count} images missing alt attributes',
+                recommendation='Add descriptive alt attributes to all images for better accessibility and SEO',
+                priority='medium'
+            )
         
         # Word count
-        text_content = soup.get_text()
-        word_count = len(re.findall(r'\b\w+\b', text_content))
-        
-        if word_count < 300:
-            checks['content_length'] = {
-                'status': 'warning',
-                'score': 3,
-                'max_score': 10,
-                'message': f'Content is quite short ({word_count} words)',
-                'recommendation': 'Consider adding more comprehensive content (aim for 300+ words)',
-                'priority': 'medium'
-            }
-        elif word_count < 500:
-            checks['content_length'] = {
-                'status': 'pass',
-                'score': 7,
-                'max_score': 10,
-                'message': f'Content length is adequate ({word_count} words)',
-                'recommendation': 'Consider expanding content for better SEO value',
-                'priority': 'low'
-            }
-        else:
-            checks['content_length'] = {
-                'status': 'pass',
-                'score': 10,
-                'max_score': 10,
-                'message': f'Content length is good ({word_count} words)',
-                'recommendation': None,
-                'priority': 'low'
-            }
+        word_count = signals['word_count']
+        checks['content_length'] = Check.from_row(
+            _WORD_COUNT_ROWS[bisect_right(_WORD_COUNT_BOUNDS, word_count)], word_count
+        )
         
         return checks
     
@@ -498,90 +608,86 @@ class SEOAnalyzer:
         checks = {}
         
         # Page load time
-        if load_time_ms < 1000:
-            checks['page_load_time'] = {
-                'status': 'pass',
-                'score': 10,
-                'max_score': 10,
-                'message': f'Page loads quickly ({load_time_ms}ms)',
-                'recommendation': None,
-                'priority': 'low'
-            }
-        elif load_time_ms < 3000:
-            checks['page_load_time'] = {
-                'status': 'warning',
-                'score': 7,
-                'max_score': 10,
-                'message': f'Page load time is acceptable ({load_time_ms}ms)',
-                'recommendation': 'Consider optimizing images and scripts to improve load time',
-                'priority': 'medium'
-            }
-        else:
-            checks['page_load_time'] = {
-                'status': 'fail',
-                'score': 3,
-                'max_score': 10,
-                'message': f'Page loads slowly ({load_time_ms}ms)',
-                'recommendation': 'Optimize images, enable compression, and minimize scripts',
-                'priority': 'high'
-            }
+        checks['page_load_time'] = Check.from_row(
+            _LOAD_TIME_ROWS[bisect_right(_LOAD_TIME_BOUNDS, load_time_ms)], load_time_ms
+        )
         
         # Compression
         if 'gzip' in response.headers.get('content-encoding', ''):
-            checks['gzip_compression'] = {
-                'status': 'pass',
-                'score': 5,
-                'max_score': 5,
-                'message': 'GZIP compression is enabled',
-                'recommendation': None,
-                'priority': 'low'
-            }
+            checks['gzip_compression'] = Check(
+                status='pass',
+                score=5,
+                max_score=5,
+                message='GZIP compression is enabled',
+                recommendation=None,
+                priority='low'
+            )
         else:
-            checks['gzip_compression'] = {
-                'status': 'fail',
-                'score': 0,
-                'max_score': 5,
-                'message': 'GZIP compression is not enabled',
-                'recommendation': 'Enable GZIP compression to reduce page size',
-                'priority': 'medium'
-            }
+            checks['gzip_compression'] = Check(
+                status='fail',
+                score=0,
+                max_score=5,
+                message='GZIP compression is not enabled',
+                recommendation='Enable GZIP compression to reduce page size',
+                priority='medium'
+            )
         
         return checks
     
-    def _check_mobile_factors(self, soup):
+    def _check_mobile_factors(self, signals):
         """Check mobile-related factors"""
         checks = {}
         
         # Viewport meta tag
-        viewport_meta = soup.find('meta', attrs={'name': 'viewport'})
-        if viewport_meta:
-            checks['viewport_meta_tag'] = {
-                'status': 'pass',
-                'score': 10,
-                'max_score': 10,
-                'message': 'Viewport meta tag is present',
-                'recommendation': None,
-                'priority': 'low'
-            }
+        if signals['viewport_present']:
+            checks['viewport_meta_tag'] = Check(
+                status='pass',
+                score=10,
+                max_score=10,
+                message='Viewport meta tag is present',
+                recommendation=None,
+                priority='low'
+            )
         else:
-            checks['viewport_meta_tag'] = {
-                'status': 'fail',
-                'score': 0,
-                'max_score': 10,
-                'message': 'Viewport meta tag is missing',
-                'recommendation': 'Add a viewport meta tag for mobile responsiveness',
-                'priority': 'high'
-            }
+            checks['viewport_meta_tag'] = Check(
+                status='fail',
+                score=0,
+                max_score=10,
+                message='Viewport meta tag is missing',
+                recommendation='Add a viewport meta tag for mobile responsiveness',
+                priority='high'
+            )
         
         return checks
     
+    def _start_host_probe(self, executor, prefix, url, probe):
+        """Submit a per-host probe unless a recent result for the same scheme and host is cached"""
+        # The cache isn't thread-safe, so only the network call goes to the pool;
+        # lookups and stores stay on the request thread
+        parsed_url = urlparse(url)
+        key = f"{prefix}:{parsed_url.scheme}:{parsed_url.netloc}"
+        
+        result = cache.get(key)
+        if result is not None:
+            return key, result, None
+        
+        return key, None, executor.submit(probe, url)
+    
+    def _finish_host_probe(self, pending):
+        """Wait for a probe started by _start_host_probe and cache its result"""
+        key, result, future = pending
+        if future is not None:
+            result = future.result()
+            cache.set(key, result, HOST_PROBE_TTL)
+        
+        return result
+    
     def _check_robots_txt(self, url):
         """Check if robots.txt exists"""
         try:
             parsed_url = urlparse(url)
             robots_url = f"{parsed_url.scheme}://{parsed_url.netloc}/robots.txt"
-            response = self.session.get(robots_url, timeout=10)
-            return response.status_code == 200
+            return self._url_exists(robots_url)
         except:
             return False
     
@@ -595,19 +701,64 @@ class SEOAnalyzer:
             ]
             
             for sitemap_url in sitemap_urls:
-                response = self.session.get(sitemap_url, timeout=10)
-                if response.status_code == 200:
+                if self._url_exists(sitemap_url):
                     return True
             return False
         except:
             return False
     
-    def _check_mobile_friendly(self, soup):
-        """Check if page is mobile-friendly"""
-        viewport_meta = soup.find('meta', attrs={'name': 'viewport'})
-        return viewport_meta is not None
+    def _url_exists(self, probe_url):
+        """Check that a URL answers successfully without downloading its body"""
+        response = self.session.head(probe_url, timeout=10, allow_redirects=True)
+        if response.status_code != 405:
+            return response.status_code == 200
+        
+        # Server doesn't support HEAD; ask for a single byte instead
+        response = self.session.get(probe_url, timeout=10, headers={'Range': 'bytes=0-0'}, stream=True)
+        response.close()
+        return response.status_code in (200, 206)
+    
+    def _get_ssl_certificate(self, url):
+        """Fetch the peer certificate of an HTTPS site, or None if the handshake fails"""
+        try:
+            hostname = urlparse(url).netloc
+            context = ssl.create_default_context()
+            with socket.create_connection((hostname, 443), timeout=10) as sock:
+                with context.wrap_socket(sock, server_hostname=hostname) as ssock:
+                    return self._format_certificate(ssock.getpeercert())
+        except Exception:
+            return None
+    
+    def _get_response_certificate(self, response):
+        """Read the peer certificate from the connection of a streamed response, if still attached"""
+        try:
+            return self._format_certificate(response.raw.connection.sock.getpeercert())
+        except Exception:
+            return None
+    
+    def _format_certificate(self, cert):
+        """Pick the certificate fields stored with a security scan"""
+        return {
+            'subject': dict(x[0] for x in cert['subject']),
+            'issuer': dict(x[0] for x in cert['issuer']),
+            'version': cert['version'],
+            'serial_number': cert['serialNumber'],
+            'not_before': cert['notBefore'],
+            'not_after': cert['notAfter']
+        }
+    
+    def _count_words(self, tree):
+        """Count words in the visible body text, skipping script, style, noscript and template content"""
+        body = tree.find('body')
+        if body is None:
+            body = tree
+        
+        word_count = 0
+        for text in _XP_VISIBLE_TEXT(body):
+            word_count += len(_WORD_RE.findall(text))
+        return word_count
     
-    def _extract_schema_markup(self, soup):
+    def _extract_schema_markup(self, soup, tree):
         """Extract structured data/schema markup"""
         schema_data = {}
         
@@ -617,37 +768,29 @@ class SEOAnalyzer:
             schema_data['json_ld'] = []
             for script in json_ld_scripts:
                 try:
-                    data = json.loads(script.string)
+                    data = _json_loads(script.string)
                     schema_data['json_ld'].append(data)
                 except:
                     pass
         
         # Microdata
-        microdata_items = soup.find_all(attrs={'itemscope': True})
-        if microdata_items:
-            schema_data['microdata'] = len(microdata_items)
+        microdata_count = int(_XP_MICRODATA_COUNT(tree))
+        if microdata_count:
+            schema_data['microdata'] = microdata_count
         
         return schema_data
     
-    def _extract_social_tags(self, soup):
+    def _extract_social_tags(self, meta_info):
         """Extract social media meta tags"""
         social_tags = {}
         
         # Open Graph tags
-        og_tags = soup.find_all('meta', attrs={'property': re.compile(r'^og:')})
-        if og_tags:
-            social_tags['open_graph'] = {}
-            for tag in og_tags:
-                property_name = tag.get('property', '').replace('og:', '')
-                social_tags['open_graph'][property_name] = tag.get('content', '')
+        if meta_info.open_graph:
+            social_tags['open_graph'] = meta_info.open_graph
         
         # Twitter Card tags
-        twitter_tags = soup.find_all('meta', attrs={'name': re.compile(r'^twitter:')})
-        if twitter_tags:
-            social_tags['twitter'] = {}
-            for tag in twitter_tags:
-                name = tag.get('name', '').replace('twitter:', '')
-                social_tags['twitter'][name] = tag.get('content', '')
+        if meta_info.twitter:
+            social_tags['twitter'] = meta_info.twitter
         
         return social_tags
     
@@ -656,11 +799,10 @@ class SEOAnalyzer:
         total_score = 0
         max_total_score = 0
         
-        for category, checks in details.items():
-            for check_name, check_data in checks.items():
-                if 'score' in check_data and 'max_score' in check_data:
-                    total_score += check_data['score']
-                    max_total_score += check_data['max_score']
+        for checks in details.values():
+            for check in checks.values():
+                total_score += check.score
+                max_total_score += check.max_score
         
         if max_total_score == 0:
             return 0
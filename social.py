@@ -1,423 +1,605 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, abort, request, jsonify, Response, stream_with_context, make_response
+from werkzeug.exceptions import HTTPException
+from sqlalchemy import func, select, update, case, and_, or_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import load_only
 from src.models.user import db
 from src.models.audit import Website, SocialProfile
 from src.services.social_analyzer import SocialAnalyzer
-from datetime import datetime
-import traceback
+from src.services.cache_service import cache
+from datetime import datetime, timedelta, timezone
+from types import MappingProxyType
+from urllib.parse import urlparse
+from functools import wraps
+import hashlib
+import csv
+import io
+
+try:
+    from ciso8601 import parse_datetime
+except ImportError:
+    def parse_datetime(value):
+        return datetime.fromisoformat(value.replace('Z', '+00:00'))
 
 social_bp = Blueprint('social', __name__)
 
+# Shared so its HTTP session keeps connections alive across requests; it holds no per-request state
+social_analyzer = SocialAnalyzer()
+
+# Cross-site aggregates only change when profiles are added, updated or removed
+PLATFORM_STATS_CACHE_KEY = 'social:platform_statistics'
+ENGAGEMENT_CACHE_KEY = 'social:engagement_analysis'
+SOCIAL_STATS_TTL = 300
+
+# Engagement rate (%) thresholds per platform; read-only since they are shared across requests
+ENGAGEMENT_BENCHMARKS = MappingProxyType({
+    'facebook': MappingProxyType({'good': 3.0, 'average': 1.5, 'poor': 0.5}),
+    'instagram': MappingProxyType({'good': 5.0, 'average': 2.5, 'poor': 1.0}),
+    'twitter': MappingProxyType({'good': 2.0, 'average': 1.0, 'poor': 0.3}),
+    'linkedin': MappingProxyType({'good': 4.0, 'average': 2.0, 'poor': 0.8}),
+    'youtube': MappingProxyType({'good': 8.0, 'average': 4.0, 'poor': 1.5}),
+    'pinterest': MappingProxyType({'good': 1.5, 'average': 0.8, 'poor': 0.2})
+})
+DEFAULT_ENGAGEMENT_BENCHMARK = MappingProxyType({'good': 3.0, 'average': 1.5, 'poor': 0.5})
+IMPORTANT_PLATFORMS = frozenset(('facebook', 'twitter', 'linkedin', 'instagram'))
+
+# Error message prefix per endpoint for unexpected failures
+ERROR_MESSAGES = MappingProxyType({
+    'social.analyze_social_presence': 'Social media analysis failed',
+    'social.get_website_social_profiles': 'Failed to get social profiles',
+    'social.get_social_metrics': 'Failed to get social metrics',
+    'social.get_platform_statistics': 'Failed to get platform statistics',
+    'social.update_social_profile': 'Failed to update social profile',
+    'social.delete_social_profile': 'Failed to delete social profile',
+    'social.analyze_engagement_trends': 'Failed to analyze engagement trends',
+    'social.export_social_data': 'Failed to export social data',
+    'social.get_social_recommendations': 'Failed to get social recommendations'
+})
+
+@social_bp.errorhandler(Exception)
+def handle_social_error(e):
+    """Turn unexpected errors in social routes into JSON 500 responses"""
+    # Let aborts such as get_or_404 keep their own status
+    if isinstance(e, HTTPException):
+        return e
+    
+    db.session.rollback()
+    message = ERROR_MESSAGES.get(request.endpoint, 'Social request failed')
+    return jsonify({'error': f'{message}: {str(e)}'}), 500
+
+def _profiles_etag(website_id=None, daily=False):
+    """ETag for responses built from social profiles: the latest update and row count,
+    for one website or all of them"""
+    query = db.session.query(func.max(SocialProfile.updated_at), func.count(SocialProfile.id))
+    if website_id is None:
+        last_updated, profile_count = query.one()
+    else:
+        # Checked in the same query, so a replayed ETag for a missing website still gets a 404
+        query = query.add_columns(select(Website.id).where(Website.id == website_id).exists())
+        last_updated, profile_count, website_exists = query.filter(SocialProfile.website_id == website_id).one()
+        if not website_exists:
+            abort(404)
+    
+    key = f"{request.endpoint}:{website_id}:{last_updated}:{profile_count}"
+    if daily:
+        key += f":{datetime.now(timezone.utc).date()}"
+    return hashlib.md5(key.encode()).hexdigest()
+
+def conditional_on_profiles(daily=False):
+    """Answer If-None-Match with 304 when the profiles behind a GET haven't changed.
+    Pass daily=True for responses that also depend on the current date."""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            etag = _profiles_etag(kwargs.get('website_id'), daily)
+            if request.if_none_match.contains(etag):
+                response = Response(status=304)
+                response.set_etag(etag)
+                return response
+            
+            response = make_response(view(*args, **kwargs))
+            if response.status_code == 200:
+                response.set_etag(etag)
+                response.headers.setdefault('Cache-Control', 'private, must-revalidate')
+            return response
+        
+        return wrapper
+    return decorator
+
+def cached_profile_stats(cache_key):
+    """Cache a cross-site aggregate view's result together with its ETag, so a warm cache
+    answers, If-None-Match included, without querying. The view returns the result dict."""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            cached = cache.get(cache_key)
+            if cached is not None:
+                return _stats_response(cached['result'], cached['etag'], 'HIT')
+            
+            etag = _profiles_etag()
+            if request.if_none_match.contains(etag):
+                return _stats_response(None, etag, 'MISS')
+            
+            result = view(*args, **kwargs)
+            cache.set(cache_key, {'etag': etag, 'result': result}, SOCIAL_STATS_TTL)
+            return _stats_response(result, etag, 'MISS')
+        
+        return wrapper
+    return decorator
+
+def _stats_response(result, etag, cache_status):
+    """Return aggregate stats, or a 304 when the client already has them, with cache headers
+    for clients and the edge"""
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        response = jsonify(result)
+    response.set_etag(etag)
+    response.headers['X-Cache'] = cache_status
+    response.headers['Cache-Control'] = 'public, max-age=60, stale-while-revalidate=60'
+    return response
+
+def _invalidate_social_stats():
+    """Drop cached aggregates after profiles change"""
+    cache.delete(PLATFORM_STATS_CACHE_KEY)
+    cache.delete(ENGAGEMENT_CACHE_KEY)
+
 @social_bp.route('/social/analyze', methods=['POST'])
 def analyze_social_presence():
     """Analyze social media presence for a website"""
-    try:
-        data = request.get_json()
-        
-        if not data or 'url' not in data:
-            return jsonify({'error': 'URL is required'}), 400
-        
-        url = data['url'].strip()
-        if not url.startswith(('http://', 'https://')):
-            url = 'https://' + url
-        
-        # Get or create website record
-        from urllib.parse import urlparse
-        domain = urlparse(url).netloc.lower()
-        
-        website = Website.query.filter_by(domain=domain).first()
-        if not website:
-            website = Website(domain=domain)
-            db.session.add(website)
-            db.session.flush()
-        
-        # Analyze social presence
-        analyzer = SocialAnalyzer()
-        result = analyzer.analyze_social_presence(website.id, url)
-        
-        return jsonify(result), 200
-        
-    except Exception as e:
-        return jsonify({'error': f'Social media analysis failed: {str(e)}'}), 500
+    data = request.get_json()
+    
+    if not data or 'url' not in data:
+        return jsonify({'error': 'URL is required'}), 400
+    
+    url = data['url'].strip()
+    if not url.startswith(('http://', 'https://')):
+        url = 'https://' + url
+    
+    # Get or create website record; domains are lowercased by the column type
+    domain = urlparse(url).netloc
+    
+    website_id = db.session.execute(
+        select(Website.id).filter_by(domain=domain)
+    ).scalar()
+    if website_id is None:
+        # Let the unique index settle concurrent first analyses of a domain
+        dialect_insert = postgresql.insert if db.engine.dialect.name == 'postgresql' else sqlite.insert
+        website_id = db.session.execute(
+            dialect_insert(Website).values(domain=domain)
+            .on_conflict_do_nothing(index_elements=['domain'])
+            .returning(Website.id)
+        ).scalar()
+        if website_id is None:
+            website_id = db.session.execute(
+                select(Website.id).filter_by(domain=domain)
+            ).scalar()
+    
+    # Analyze social presence
+    result = social_analyzer.analyze_social_presence(website_id, url)
+    _invalidate_social_stats()
+    
+    return jsonify(result), 200
 
 @social_bp.route('/social/website/<int:website_id>', methods=['GET'])
+@conditional_on_profiles()
 def get_website_social_profiles(website_id):
     """Get social media profiles for a specific website"""
-    try:
-        website = Website.query.get_or_404(website_id)
-        
-        profiles = SocialProfile.query.filter_by(website_id=website_id).all()
-        
-        result = {
-            'website': {
-                'id': website.id,
-                'domain': website.domain
-            },
-            'profiles': []
-        }
-        
-        for profile in profiles:
-            result['profiles'].append({
-                'id': profile.id,
-                'platform': profile.platform,
-                'profile_url': profile.profile_url,
-                'username': profile.username,
-                'followers_count': profile.followers_count,
-                'following_count': profile.following_count,
-                'posts_count': profile.posts_count,
-                'engagement_rate': float(profile.engagement_rate) if profile.engagement_rate else 0,
-                'last_post_date': profile.last_post_date.isoformat() if profile.last_post_date else None,
-                'verified': profile.verified,
-                'created_at': profile.created_at.isoformat(),
-                'updated_at': profile.updated_at.isoformat()
-            })
-        
-        return jsonify(result)
-        
-    except Exception as e:
-        return jsonify({'error': f'Failed to get social profiles: {str(e)}'}), 500
+    website = Website.query.get_or_404(website_id)
+    
+    profiles = SocialProfile.query.options(load_only(
+        SocialProfile.platform, SocialProfile.profile_url, SocialProfile.username,
+        SocialProfile.followers_count, SocialProfile.following_count, SocialProfile.posts_count,
+        SocialProfile.engagement_rate, SocialProfile.last_post_date, SocialProfile.verified,
+        SocialProfile.created_at, SocialProfile.updated_at
+    )).filter_by(website_id=website_id).all()
+    
+    result = {
+        'website': {
+            'id': website.id,
+            'domain': website.domain
+        },
+        'profiles': []
+    }
+    
+    for profile in profiles:
+        result['profiles'].append({
+            'id': profile.id,
+            'platform': profile.platform,
+            'profile_url': profile.profile_url,
+            'username': profile.username,
+            'followers_count': profile.followers_count,
+            'following_count': profile.following_count,
+            'posts_count': profile.posts_count,
+            'engagement_rate': float(profile.engagement_rate) if profile.engagement_rate else 0,
+            'last_post_date': profile.last_post_date,
+            'verified': profile.verified,
+            'created_at': profile.created_at,
+            'updated_at': profile.updated_at
+        })
+    
+    return jsonify(result)
 
 @social_bp.route('/social/metrics/<int:website_id>', methods=['GET'])
+@conditional_on_profiles()
 def get_social_metrics(website_id):
     """Get comprehensive social media metrics for a website"""
-    try:
-        website = Website.query.get_or_404(website_id)
-        
-        analyzer = SocialAnalyzer()
-        metrics = analyzer.get_social_metrics(website_id)
-        
-        return jsonify({
-            'website': {
-                'id': website.id,
-                'domain': website.domain
-            },
-            'metrics': metrics
-        })
-        
-    except Exception as e:
-        return jsonify({'error': f'Failed to get social metrics: {str(e)}'}), 500
+    website = Website.query.get_or_404(website_id)
+    
+    metrics = social_analyzer.get_social_metrics(website_id)
+    
+    return jsonify({
+        'website': {
+            'id': website.id,
+            'domain': website.domain
+        },
+        'metrics': metrics
+    })
 
 @social_bp.route('/social/platforms', methods=['GET'])
+@cached_profile_stats(PLATFORM_STATS_CACHE_KEY)
 def get_platform_statistics():
     """Get statistics across all social media platforms"""
-    try:
-        from sqlalchemy import func
-        
-        # Get platform statistics
-        platform_stats = db.session.query(
+    # Get platform statistics
+    platform_stats = db.session.query(
+        SocialProfile.platform,
+        func.count(SocialProfile.id).label('profile_count'),
+        func.sum(SocialProfile.followers_count).label('total_followers'),
+        func.avg(SocialProfile.engagement_rate).label('avg_engagement')
+    ).group_by(SocialProfile.platform).all()
+    
+    # Get top profiles by followers, joining the domain in rather than
+    # lazy-loading profile.website once per row. Unknown counts are skipped,
+    # which also lets this read the partial followers index in order
+    top_profiles = db.session.execute(
+        select(
+            SocialProfile.id,
             SocialProfile.platform,
-            func.count(SocialProfile.id).label('profile_count'),
-            func.sum(SocialProfile.followers_count).label('total_followers'),
-            func.avg(SocialProfile.engagement_rate).label('avg_engagement')
-        ).group_by(SocialProfile.platform).all()
-        
-        # Get top profiles by followers
-        top_profiles = SocialProfile.query.order_by(
-            SocialProfile.followers_count.desc()
-        ).limit(10).all()
-        
-        # Get recent social activity
-        recent_profiles = SocialProfile.query.order_by(
-            SocialProfile.updated_at.desc()
-        ).limit(20).all()
-        
-        result = {
-            'platform_statistics': [
-                {
-                    'platform': platform,
-                    'profile_count': count,
-                    'total_followers': int(total_followers) if total_followers else 0,
-                    'average_engagement': round(float(avg_engagement), 2) if avg_engagement else 0
-                }
-                for platform, count, total_followers, avg_engagement in platform_stats
-            ],
-            'top_profiles': [
-                {
-                    'id': profile.id,
-                    'platform': profile.platform,
-                    'username': profile.username,
-                    'domain': profile.website.domain,
-                    'followers_count': profile.followers_count,
-                    'engagement_rate': float(profile.engagement_rate) if profile.engagement_rate else 0,
-                    'verified': profile.verified
-                }
-                for profile in top_profiles
-            ],
-            'recent_activity': [
-                {
-                    'id': profile.id,
-                    'platform': profile.platform,
-                    'username': profile.username,
-                    'domain': profile.website.domain,
-                    'updated_at': profile.updated_at.isoformat()
-                }
-                for profile in recent_profiles
-            ]
-        }
-        
-        return jsonify(result)
-        
-    except Exception as e:
-        return jsonify({'error': f'Failed to get platform statistics: {str(e)}'}), 500
+            SocialProfile.username,
+            Website.domain,
+            SocialProfile.followers_count,
+            SocialProfile.engagement_rate,
+            SocialProfile.verified
+        ).join(Website, Website.id == SocialProfile.website_id)
+        .where(SocialProfile.followers_count.isnot(None))
+        .order_by(SocialProfile.followers_count.desc())
+        .limit(10)
+    ).all()
+    
+    # Get recent social activity
+    recent_profiles = db.session.execute(
+        select(
+            SocialProfile.id,
+            SocialProfile.platform,
+            SocialProfile.username,
+            Website.domain,
+            SocialProfile.updated_at
+        ).join(Website, Website.id == SocialProfile.website_id)
+        .order_by(SocialProfile.updated_at.desc())
+        .limit(20)
+    ).all()
+    
+    result = {
+        'platform_statistics': [
+            {
+                'platform': platform,
+                'profile_count': count,
+                'total_followers': int(total_followers) if total_followers else 0,
+                'average_engagement': round(float(avg_engagement), 2) if avg_engagement else 0
+            }
+            for platform, count, total_followers, avg_engagement in platform_stats
+        ],
+        'top_profiles': [
+            {
+                'id': profile.id,
+                'platform': profile.platform,
+                'username': profile.username,
+                'domain': profile.domain,
+                'followers_count': profile.followers_count,
+                'engagement_rate': float(profile.engagement_rate) if profile.engagement_rate else 0,
+                'verified': profile.verified
+            }
+            for profile in top_profiles
+        ],
+        'recent_activity': [
+            {
+                'id': profile.id,
+                'platform': profile.platform,
+                'username': profile.username,
+                'domain': profile.domain,
+                'updated_at': profile.updated_at
+            }
+            for profile in recent_profiles
+        ]
+    }
+    
+    return result
 
 @social_bp.route('/social/profile/<int:profile_id>', methods=['PUT'])
 def update_social_profile(profile_id):
     """Update social media profile information"""
-    try:
-        profile = SocialProfile.query.get_or_404(profile_id)
-        data = request.get_json()
-        
-        if not data:
-            return jsonify({'error': 'No data provided'}), 400
-        
-        # Update allowed fields
-        if 'followers_count' in data:
-            profile.followers_count = data['followers_count']
-        if 'following_count' in data:
-            profile.following_count = data['following_count']
-        if 'posts_count' in data:
-            profile.posts_count = data['posts_count']
-        if 'engagement_rate' in data:
-            profile.engagement_rate = data['engagement_rate']
-        if 'verified' in data:
-            profile.verified = data['verified']
-        if 'last_post_date' in data:
-            if data['last_post_date']:
-                profile.last_post_date = datetime.fromisoformat(data['last_post_date'].replace('Z', '+00:00'))
-            else:
-                profile.last_post_date = None
-        
-        profile.updated_at = datetime.utcnow()
-        
-        db.session.commit()
-        
-        return jsonify({
-            'id': profile.id,
-            'platform': profile.platform,
-            'message': 'Social profile updated successfully'
-        })
-        
-    except Exception as e:
+    data = request.get_json()
+    
+    if not data:
+        return jsonify({'error': 'No data provided'}), 400
+    
+    # Update allowed fields
+    values = {
+        field: data[field]
+        for field in ('followers_count', 'following_count', 'posts_count', 'engagement_rate', 'verified')
+        if field in data
+    }
+    if 'last_post_date' in data:
+        if data['last_post_date']:
+            values['last_post_date'] = parse_datetime(data['last_post_date'])
+        else:
+            values['last_post_date'] = None
+    
+    # Stamped by the database with the transaction time
+    values['updated_at'] = func.now()
+    
+    # Update and read back in one statement instead of loading the profile first
+    profile = db.session.execute(
+        update(SocialProfile)
+        .where(SocialProfile.id == profile_id)
+        .values(**values)
+        .returning(SocialProfile.id, SocialProfile.platform)
+    ).one_or_none()
+    
+    if profile is None:
         db.session.rollback()
-        return jsonify({'error': f'Failed to update social profile: {str(e)}'}), 500
+        return jsonify({'error': 'Social profile not found'}), 404
+    
+    db.session.commit()
+    _invalidate_social_stats()
+    
+    return jsonify({
+        'id': profile.id,
+        'platform': profile.platform,
+        'message': 'Social profile updated successfully'
+    })
 
 @social_bp.route('/social/profile/<int:profile_id>', methods=['DELETE'])
 def delete_social_profile(profile_id):
     """Delete a social media profile record"""
-    try:
-        profile = SocialProfile.query.get_or_404(profile_id)
-        
-        db.session.delete(profile)
-        db.session.commit()
-        
-        return jsonify({'message': 'Social profile deleted successfully'})
-        
-    except Exception as e:
-        db.session.rollback()
-        return jsonify({'error': f'Failed to delete social profile: {str(e)}'}), 500
+    profile = SocialProfile.query.get_or_404(profile_id)
+    
+    db.session.delete(profile)
+    db.session.commit()
+    _invalidate_social_stats()
+    
+    return jsonify({'message': 'Social profile deleted successfully'})
 
 @social_bp.route('/social/engagement-analysis', methods=['GET'])
+@cached_profile_stats(ENGAGEMENT_CACHE_KEY)
 def analyze_engagement_trends():
     """Analyze engagement trends across platforms"""
-    try:
-        from sqlalchemy import func
-        
-        # Get engagement data by platform
-        engagement_data = db.session.query(
-            SocialProfile.platform,
-            func.avg(SocialProfile.engagement_rate).label('avg_engagement'),
-            func.min(SocialProfile.engagement_rate).label('min_engagement'),
-            func.max(SocialProfile.engagement_rate).label('max_engagement'),
-            func.count(SocialProfile.id).label('profile_count')
-        ).group_by(SocialProfile.platform).all()
-        
-        # Calculate benchmarks
-        benchmarks = {
-            'facebook': {'good': 3.0, 'average': 1.5, 'poor': 0.5},
-            'instagram': {'good': 5.0, 'average': 2.5, 'poor': 1.0},
-            'twitter': {'good': 2.0, 'average': 1.0, 'poor': 0.3},
-            'linkedin': {'good': 4.0, 'average': 2.0, 'poor': 0.8},
-            'youtube': {'good': 8.0, 'average': 4.0, 'poor': 1.5},
-            'pinterest': {'good': 1.5, 'average': 0.8, 'poor': 0.2}
-        }
-        
-        result = {
-            'engagement_analysis': [],
-            'benchmarks': benchmarks,
-            'insights': []
-        }
-        
-        for platform, avg_eng, min_eng, max_eng, count in engagement_data:
-            avg_engagement = float(avg_eng) if avg_eng else 0
-            
-            # Determine performance level
-            benchmark = benchmarks.get(platform, {'good': 3.0, 'average': 1.5, 'poor': 0.5})
-            if avg_engagement >= benchmark['good']:
-                performance = 'excellent'
-            elif avg_engagement >= benchmark['average']:
-                performance = 'good'
-            elif avg_engagement >= benchmark['poor']:
-                performance = 'average'
-            else:
-                performance = 'poor'
-            
-            result['engagement_analysis'].append({
-                'platform': platform,
-                'average_engagement': round(avg_engagement, 2),
-                'min_engagement': round(float(min_eng), 2) if min_eng else 0,
-                'max_engagement': round(float(max_eng), 2) if max_eng else 0,
-                'profile_count': count,
-                'performance_level': performance
-            })
-        
-        # Generate insights
-        if engagement_data:
-            best_platform = max(engagement_data, key=lambda x: float(x[1]) if x[1] else 0)
-            worst_platform = min(engagement_data, key=lambda x: float(x[1]) if x[1] else 0)
-            
-            result['insights'] = [
-                f"Best performing platform: {best_platform[0]} with {float(best_platform[1]):.2f}% average engagement",
-                f"Platform needing attention: {worst_platform[0]} with {float(worst_platform[1]):.2f}% average engagement",
-                f"Total profiles analyzed: {sum(row[4] for row in engagement_data)}"
-            ]
-        
-        return jsonify(result)
-        
-    except Exception as e:
-        return jsonify({'error': f'Failed to analyze engagement trends: {str(e)}'}), 500
+    # Per-platform benchmark thresholds as SQL expressions, so the database
+    # can bucket both the platform average and each profile
+    def benchmark_level(level):
+        return case(
+            {platform: levels[level] for platform, levels in ENGAGEMENT_BENCHMARKS.items()},
+            value=SocialProfile.platform,
+            else_=DEFAULT_ENGAGEMENT_BENCHMARK[level]
+        )
+    
+    good, average, poor = benchmark_level('good'), benchmark_level('average'), benchmark_level('poor')
+    avg_engagement_expr = func.avg(SocialProfile.engagement_rate)
+    profile_rate = func.coalesce(SocialProfile.engagement_rate, 0)
+    
+    # Get engagement data by platform
+    engagement_data = db.session.query(
+        SocialProfile.platform,
+        avg_engagement_expr.label('avg_engagement'),
+        func.min(SocialProfile.engagement_rate).label('min_engagement'),
+        func.max(SocialProfile.engagement_rate).label('max_engagement'),
+        func.count(SocialProfile.id).label('profile_count'),
+        case(
+            (avg_engagement_expr >= good, 'excellent'),
+            (avg_engagement_expr >= average, 'good'),
+            (avg_engagement_expr >= poor, 'average'),
+            else_='poor'
+        ).label('performance_level'),
+        func.count().filter(profile_rate >= good).label('excellent_profiles'),
+        func.count().filter(profile_rate < good, profile_rate >= average).label('good_profiles'),
+        func.count().filter(profile_rate < average, profile_rate >= poor).label('average_profiles'),
+        func.count().filter(profile_rate < poor).label('poor_profiles')
+    ).group_by(SocialProfile.platform).all()
+    
+    result = {
+        'engagement_analysis': [],
+        'benchmarks': {platform: dict(levels) for platform, levels in ENGAGEMENT_BENCHMARKS.items()},
+        'insights': []
+    }
+    
+    # Track the best/worst platform and total profiles while building the rows
+    best_platform = worst_platform = None
+    total_profiles = 0
+    
+    for row in engagement_data:
+        avg_engagement = float(row.avg_engagement) if row.avg_engagement else 0
+        
+        if best_platform is None or avg_engagement > best_platform[1]:
+            best_platform = (row.platform, avg_engagement)
+        if worst_platform is None or avg_engagement < worst_platform[1]:
+            worst_platform = (row.platform, avg_engagement)
+        total_profiles += row.profile_count
+        
+        result['engagement_analysis'].append({
+            'platform': row.platform,
+            'average_engagement': round(avg_engagement, 2),
+            'min_engagement': round(float(row.min_engagement), 2) if row.min_engagement else 0,
+            'max_engagement': round(float(row.max_engagement), 2) if row.max_engagement else 0,
+            'profile_count': row.profile_count,
+            'performance_level': row.performance_level,
+            'performance_distribution': {
+                'excellent': row.excellent_profiles,
+                'good': row.good_profiles,
+                'average': row.average_profiles,
+                'poor': row.poor_profiles
+            }
+        })
+    
+    # Generate insights
+    if engagement_data:
+        result['insights'] = [
+            f"Best performing platform: {best_platform[0]} with {best_platform[1]:.2f}% average engagement",
+            f"Platform needing attention: {worst_platform[0]} with {worst_platform[1]:.2f}% average engagement",
+            f"Total profiles analyzed: {total_profiles}"
+        ]
+    
+    return result
 
 @social_bp.route('/social/export/<int:website_id>', methods=['GET'])
+@conditional_on_profiles(daily=True)
 def export_social_data(website_id):
     """Export social media data as CSV"""
-    try:
-        website = Website.query.get_or_404(website_id)
-        profiles = SocialProfile.query.filter_by(website_id=website_id).all()
-        
-        # Create CSV data
-        import csv
-        import io
-        
+    website = Website.query.get_or_404(website_id)
+    
+    # Plain column tuples, fetched from the server in chunks, instead of ORM objects
+    rows = db.session.execute(
+        select(
+            SocialProfile.platform, SocialProfile.username, SocialProfile.profile_url,
+            SocialProfile.followers_count, SocialProfile.following_count, SocialProfile.posts_count,
+            SocialProfile.engagement_rate, SocialProfile.verified, SocialProfile.last_post_date,
+            SocialProfile.created_at, SocialProfile.updated_at
+        ).where(SocialProfile.website_id == website_id),
+        execution_options={'yield_per': 1000}
+    )
+    
+    def format_row(row):
+        (platform, username, profile_url, followers_count, following_count, posts_count,
+         engagement_rate, verified, last_post_date, created_at, updated_at) = row
+        return (
+            platform,
+            username or '',
+            profile_url or '',
+            followers_count or 0,
+            following_count or 0,
+            posts_count or 0,
+            float(engagement_rate) if engagement_rate else 0,
+            'Yes' if verified else 'No',
+            last_post_date.isoformat() if last_post_date else '',
+            created_at.isoformat(),
+            updated_at.isoformat()
+        )
+    
+    def generate():
+        # Stream one chunk of rows at a time instead of building the whole file in memory
         output = io.StringIO()
         writer = csv.writer(output)
         
+        def flush():
+            value = output.getvalue()
+            output.seek(0)
+            output.truncate(0)
+            return value
+        
         # Write header
         writer.writerow([
             'Platform', 'Username', 'Profile URL', 'Followers', 'Following',
             'Posts', 'Engagement Rate', 'Verified', 'Last Post Date',
             'Created At', 'Updated At'
         ])
+        yield flush()
         
         # Write data
-        for profile in profiles:
-            writer.writerow([
-                profile.platform,
-                profile.username or '',
-                profile.profile_url or '',
-                profile.followers_count or 0,
-                profile.following_count or 0,
-                profile.posts_count or 0,
-                float(profile.engagement_rate) if profile.engagement_rate else 0,
-                'Yes' if profile.verified else 'No',
-                profile.last_post_date.isoformat() if profile.last_post_date else '',
-                profile.created_at.isoformat(),
-                profile.updated_at.isoformat()
-            ])
-        
-        output.seek(0)
-        
-        from flask import Response
-        return Response(
-            output.getvalue(),
-            mimetype='text/csv',
-            headers={
-                'Content-Disposition': f'attachment; filename=social_profiles_{website.domain}_{datetime.now().strftime("%Y%m%d")}.csv'
-            }
-        )
-        
-    except Exception as e:
-        return jsonify({'error': f'Failed to export social data: {str(e)}'}), 500
+        for partition in rows.partitions():
+            writer.writerows(map(format_row, partition))
+            yield flush()
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/csv',
+        headers={
+            'Content-Disposition': f'attachment; filename=social_profiles_{website.domain}_{datetime.now().strftime("%Y%m%d")}.csv'
+        }
+    )
 
 @social_bp.route('/social/recommendations/<int:website_id>', methods=['GET'])
+@conditional_on_profiles(daily=True)
 def get_social_recommendations(website_id):
     """Get social media optimization recommendations"""
-    try:
-        website = Website.query.get_or_404(website_id)
-        profiles = SocialProfile.query.filter_by(website_id=website_id).all()
-        
-        recommendations = []
-        
-        # Check platform presence
-        existing_platforms = {profile.platform for profile in profiles}
-        important_platforms = {'facebook', 'twitter', 'linkedin', 'instagram'}
-        missing_platforms = important_platforms - existing_platforms
-        
-        if missing_platforms:
-            recommendations.append({
-                'type': 'platform_expansion',
-                'priority': 'medium',
-                'title': 'Expand Platform Presence',
-                'description': f"Consider creating profiles on: {', '.join(missing_platforms)}",
-                'action': 'Create new social media profiles to reach wider audiences'
-            })
-        
-        # Check engagement rates
-        low_engagement_profiles = [
-            profile for profile in profiles 
-            if profile.engagement_rate and float(profile.engagement_rate) < 2.0
-        ]
-        
-        if low_engagement_profiles:
-            platforms = [profile.platform for profile in low_engagement_profiles]
-            recommendations.append({
-                'type': 'engagement_improvement',
-                'priority': 'high',
-                'title': 'Improve Engagement',
-                'description': f"Low engagement detected on: {', '.join(platforms)}",
-                'action': 'Focus on creating more engaging content and interacting with followers'
-            })
-        
-        # Check posting frequency
-        inactive_profiles = []
-        for profile in profiles:
-            if profile.last_post_date:
-                days_since_post = (datetime.utcnow() - profile.last_post_date).days
-                if days_since_post > 30:
-                    inactive_profiles.append(profile)
-        
-        if inactive_profiles:
-            platforms = [profile.platform for profile in inactive_profiles]
-            recommendations.append({
-                'type': 'posting_frequency',
-                'priority': 'medium',
-                'title': 'Increase Posting Frequency',
-                'description': f"Inactive profiles detected on: {', '.join(platforms)}",
-                'action': 'Maintain regular posting schedule to keep audience engaged'
-            })
-        
-        # Check verification status
-        unverified_large_profiles = [
-            profile for profile in profiles 
-            if not profile.verified and profile.followers_count and profile.followers_count > 10000
-        ]
-        
-        if unverified_large_profiles:
-            platforms = [profile.platform for profile in unverified_large_profiles]
-            recommendations.append({
-                'type': 'verification',
-                'priority': 'low',
-                'title': 'Seek Verification',
-                'description': f"Large unverified profiles on: {', '.join(platforms)}",
-                'action': 'Apply for verification badges to increase credibility'
-            })
-        
-        return jsonify({
-            'website': {
-                'id': website.id,
-                'domain': website.domain
-            },
-            'total_recommendations': len(recommendations),
-            'recommendations': recommendations
+    website = Website.query.get_or_404(website_id)
+    
+    def any_profile(condition):
+        return func.max(case((condition, 1), else_=0))
+    
+    # One row per platform flagging which checks any of its profiles fail
+    # Stored timestamps are naive UTC
+    inactive_cutoff = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(days=31)
+    platform_flags = db.session.query(
+        SocialProfile.platform,
+        any_profile(and_(
+            SocialProfile.engagement_rate != 0,
+            SocialProfile.engagement_rate < 2.0
+        )).label('low_engagement'),
+        any_profile(SocialProfile.last_post_date <= inactive_cutoff).label('inactive'),
+        any_profile(and_(
+            or_(SocialProfile.verified == False, SocialProfile.verified.is_(None)),
+            SocialProfile.followers_count > 10000
+        )).label('unverified_large')
+    ).filter(
+        SocialProfile.website_id == website_id
+    ).group_by(SocialProfile.platform).order_by(func.min(SocialProfile.id)).all()
+    
+    recommendations = []
+    
+    # Check platform presence
+    existing_platforms = {row.platform for row in platform_flags}
+    missing_platforms = IMPORTANT_PLATFORMS - existing_platforms
+    
+    if missing_platforms:
+        recommendations.append({
+            'type': 'platform_expansion',
+            'priority': 'medium',
+            'title': 'Expand Platform Presence',
+            'description': f"Consider creating profiles on: {', '.join(missing_platforms)}",
+            'action': 'Create new social media profiles to reach wider audiences'
         })
-        
-    except Exception as e:
-        return jsonify({'error': f'Failed to get social recommendations: {str(e)}'}), 500
+    
+    # Check engagement rates
+    low_engagement_platforms = [row.platform for row in platform_flags if row.low_engagement]
+    
+    if low_engagement_platforms:
+        recommendations.append({
+            'type': 'engagement_improvement',
+            'priority': 'high',
+            'title': 'Improve Engagement',
+            'description': f"Low engagement detected on: {', '.join(low_engagement_platforms)}",
+            'action': 'Focus on creating more engaging content and interacting with followers'
+        })
+    
+    # Check posting frequency (no post in over 30 days)
+    inactive_platforms = [row.platform for row in platform_flags if row.inactive]
+    
+    if inactive_platforms:
+        recommendations.append({
+            'type': 'posting_frequency',
+            'priority': 'medium',
+            'title': 'Increase Posting Frequency',
+            'description': f"Inactive profiles detected on: {', '.join(inactive_platforms)}",
+            'action': 'Maintain regular posting schedule to keep audience engaged'
+        })
+    
+    # Check verification status
+    unverified_large_platforms = [row.platform for row in platform_flags if row.unverified_large]
+    
+    if unverified_large_platforms:
+        recommendations.append({
+            'type': 'verification',
+            'priority': 'low',
+            'title': 'Seek Verification',
+            'description': f"Large unverified profiles on: {', '.join(unverified_large_platforms)}",
+            'action': 'Apply for verification badges to increase credibility'
+        })
+    
+    return jsonify({
+        'website': {
+            'id': website.id,
+            'domain': website.domain
+        },
+        'total_recommendations': len(recommendations),
+        'recommendations': recommendations
+    })
 
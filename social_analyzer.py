@@ -1,11 +1,148 @@
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from bs4 import BeautifulSoup
 from urllib.parse import urljoin, urlparse
 import re
 import json
+import time
+import random
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
+from sqlalchemy import select, update
 from src.models.audit import SocialProfile, Website
 from src.models.user import db
+from src.services.cache_service import cache
+from src.services.seo_analyzer import read_capped_content
+
+# RE2 matches in linear time over the whole page; fall back to the stdlib engine without it
+try:
+    import re2 as _link_re_engine
+except ImportError:
+    _link_re_engine = re
+
+# Social signal score ladders: bounds bisected against the value, and the points per bucket
+FOLLOWER_SCORE_BOUNDS = (100, 1000, 10000)
+FOLLOWER_SCORES = (10, 20, 30, 40)
+ENGAGEMENT_SCORE_BOUNDS = (1, 3, 5)
+ENGAGEMENT_SCORES = (5, 15, 25, 30)
+DIVERSITY_SCORE_BOUNDS = (2, 3, 4)
+DIVERSITY_SCORES = (5, 10, 15, 20)
+
+# Demo-mode profile metrics: (low, high) integer ranges, (low, high) float ranges for
+# engagement, days since the last post, and per-platform metrics where a tuple is an
+# integer range and a list is a set of choices
+SIMULATED_PROFILES = {
+    'facebook': {
+        'followers_count': (100, 50000),
+        'following_count': (50, 1000),
+        'posts_count': (10, 500),
+        'engagement_rate': (1.0, 8.0),
+        'last_post_days': (1, 30),
+        'metrics': {
+            'likes_avg': (10, 500),
+            'comments_avg': (2, 50),
+            'shares_avg': (1, 25),
+            'posting_frequency': ['daily', 'weekly', 'monthly']
+        }
+    },
+    'twitter': {
+        'followers_count': (50, 100000),
+        'following_count': (100, 5000),
+        'posts_count': (50, 10000),
+        'engagement_rate': (0.5, 5.0),
+        'last_post_days': (1, 7),
+        'metrics': {
+            'retweets_avg': (5, 100),
+            'likes_avg': (10, 500),
+            'replies_avg': (1, 20),
+            'posting_frequency': ['multiple_daily', 'daily', 'weekly']
+        }
+    },
+    'linkedin': {
+        'followers_count': (100, 25000),
+        'following_count': (200, 2000),
+        'posts_count': (20, 200),
+        'engagement_rate': (2.0, 10.0),
+        'last_post_days': (1, 14),
+        'metrics': {
+            'likes_avg': (20, 200),
+            'comments_avg': (5, 50),
+            'shares_avg': (2, 30),
+            'posting_frequency': ['weekly', 'bi-weekly', 'monthly']
+        }
+    },
+    'instagram': {
+        'followers_count': (200, 75000),
+        'following_count': (100, 3000),
+        'posts_count': (30, 1000),
+        'engagement_rate': (1.5, 12.0),
+        'last_post_days': (1, 10),
+        'metrics': {
+            'likes_avg': (50, 1000),
+            'comments_avg': (5, 100),
+            'stories_per_week': (3, 21),
+            'posting_frequency': ['daily', 'every_other_day', 'weekly']
+        }
+    },
+    'youtube': {
+        'followers_count': (100, 500000),  # subscribers
+        'following_count': (0, 0),  # YouTube doesn't show subscriptions
+        'posts_count': (10, 500),  # videos
+        'engagement_rate': (2.0, 15.0),
+        'last_post_days': (1, 30),
+        'metrics': {
+            'views_avg': (500, 50000),
+            'likes_avg': (20, 2000),
+            'comments_avg': (5, 200),
+            'upload_frequency': ['weekly', 'bi-weekly', 'monthly']
+        }
+    },
+    'pinterest': {
+        'followers_count': (50, 10000),
+        'following_count': (100, 5000),
+        'posts_count': (20, 2000),  # pins
+        'engagement_rate': (0.5, 3.0),
+        'last_post_days': (1, 14),
+        'metrics': {
+            'repins_avg': (5, 100),
+            'likes_avg': (2, 50),
+            'boards_count': (5, 50),
+            'posting_frequency': ['daily', 'weekly', 'monthly']
+        }
+    }
+}
+
+# Page scans are reused for a short while, and kept longer as a fallback
+# for when the site can't be reached
+PAGE_CACHE_TTL = 30
+PAGE_STALE_TTL = 3600
+
+# Platforms every site is expected to have a presence on, in reporting order
+IMPORTANT_PLATFORMS = ('facebook', 'twitter', 'linkedin', 'instagram')
+
+# Profile metrics are shared across audits that link the same profile
+PROFILE_CACHE_TTL = 3600
+
+# Social meta tags, Twitter Card tags and social widgets (by class name), matched in a single pass
+_SOCIAL_TAGS_SELECTOR = ', '.join(
+    ['meta[property^="og:"]', 'meta[property^="twitter:"]', 'meta[name^="twitter:"]'] + [
+        f'{tag}[class*="{keyword}" i]'
+        for tag in ('div', 'span', 'a')
+        for keyword in ('social', 'facebook', 'twitter', 'instagram', 'linkedin')
+    ]
+)
+
+# Profile name following a platform's link prefix
+_PROFILE_NAME_PATTERN = r'[^/\s"\']+'
+
+@dataclass(slots=True)
+class SocialTags:
+    """Social tags read from the page in one pass"""
+    open_graph: dict = field(default_factory=dict)
+    twitter_card: dict = field(default_factory=dict)
+    profile_tags: list = field(default_factory=list)
 
 class SocialAnalyzer:
     def __init__(self):
@@ -13,82 +150,101 @@ class SocialAnalyzer:
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         })
+        
+        # Keep connections alive across audits of the same hosts, and retry
+        # transient gateway errors
+        adapter = HTTPAdapter(
+            pool_connections=32,
+            pool_maxsize=32,
+            max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[502, 503, 504], allowed_methods=['GET'])
+        )
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
         self.timeout = 30
+        self._rng = random.Random()
         
         # Social media platforms to analyze
         self.platforms = {
             'facebook': {
                 'base_url': 'https://www.facebook.com/',
-                'search_patterns': [
-                    r'facebook\.com/([^/\s"\']+)',
-                    r'fb\.me/([^/\s"\']+)'
+                'link_prefixes': [
+                    r'facebook\.com/',
+                    r'fb\.me/'
                 ]
             },
             'twitter': {
                 'base_url': 'https://twitter.com/',
-                'search_patterns': [
-                    r'twitter\.com/([^/\s"\']+)',
-                    r't\.co/([^/\s"\']+)'
+                'link_prefixes': [
+                    r'twitter\.com/',
+                    r't\.co/'
                 ]
             },
             'linkedin': {
                 'base_url': 'https://www.linkedin.com/',
-                'search_patterns': [
-                    r'linkedin\.com/company/([^/\s"\']+)',
-                    r'linkedin\.com/in/([^/\s"\']+)'
+                'link_prefixes': [
+                    r'linkedin\.com/company/',
+                    r'linkedin\.com/in/'
                 ]
             },
             'instagram': {
                 'base_url': 'https://www.instagram.com/',
-                'search_patterns': [
-                    r'instagram\.com/([^/\s"\']+)'
+                'link_prefixes': [
+                    r'instagram\.com/'
                 ]
             },
             'youtube': {
                 'base_url': 'https://www.youtube.com/',
-                'search_patterns': [
-                    r'youtube\.com/channel/([^/\s"\']+)',
-                    r'youtube\.com/c/([^/\s"\']+)',
-                    r'youtube\.com/user/([^/\s"\']+)'
+                'link_prefixes': [
+                    r'youtube\.com/channel/',
+                    r'youtube\.com/c/',
+                    r'youtube\.com/user/'
                 ]
             },
             'pinterest': {
                 'base_url': 'https://www.pinterest.com/',
-                'search_patterns': [
-                    r'pinterest\.com/([^/\s"\']+)'
+                'link_prefixes': [
+                    r'pinterest\.com/'
                 ]
             }
         }
+        
+        # All platforms' profile links as one alternation, so the page is scanned
+        # once; each branch names its profile group so lastgroup gives the platform
+        self._link_platforms = {}
+        branches = []
+        for platform, config in self.platforms.items():
+            for index, prefix in enumerate(config['link_prefixes']):
+                group_name = f'{platform}_{index}'
+                self._link_platforms[group_name] = platform
+                branches.append(f'{prefix}(?P<{group_name}>{_PROFILE_NAME_PATTERN})')
+        self._profile_link_re = _link_re_engine.compile('(?i)' + '|'.join(branches))
+        
+        # Any platform name appearing in a widget's href, found in one scan
+        self._platform_name_re = re.compile('|'.join(map(re.escape, self.platforms)), re.IGNORECASE)
     
     def analyze_social_presence(self, website_id, target_url):
         """Analyze social media presence for a website"""
         try:
-            # Get the website content to look for social links
-            response = self.session.get(target_url, timeout=self.timeout)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
-            page_content = response.text
+            # Get the website's social tags and the profiles it links to
+            social_tags, discovered_profiles, etag, last_modified = self._scan_page(target_url)
             
-            # Find social media profiles
-            discovered_profiles = self._discover_social_profiles(page_content, soup, target_url)
+            # Record the page's validators alongside the website; committed with the profiles
+            db.session.execute(
+                update(Website).where(Website.id == website_id).values(etag=etag, last_modified=last_modified)
+            )
             
             # Analyze each discovered profile
             social_data = []
             for profile in discovered_profiles:
-                try:
-                    profile_data = self._analyze_social_profile(profile)
-                    if profile_data:
-                        social_data.append(profile_data)
-                except Exception as e:
-                    print(f"Error analyzing {profile['platform']} profile: {str(e)}")
-                    continue
+                profile_data = self._analyze_social_profile(profile)
+                if profile_data:
+                    social_data.append(profile_data)
             
             # Save to database
             self._save_social_profiles(website_id, social_data)
             
             # Generate social media recommendations
-            recommendations = self._generate_social_recommendations(social_data, soup)
+            recommendations = self._generate_social_recommendations(social_data, social_tags)
             
             return {
                 'total_profiles': len(social_data),
@@ -96,78 +252,147 @@ class SocialAnalyzer:
                 'profiles': social_data,
                 'recommendations': recommendations,
                 'social_signals': self._calculate_social_signals(social_data),
-                'analysis_date': datetime.utcnow().isoformat()
+                'analysis_date': datetime.utcnow()
             }
             
         except Exception as e:
             raise Exception(f"Social media analysis failed: {str(e)}")
     
-    def _discover_social_profiles(self, page_content, soup, target_url):
+    def _scan_page(self, url):
+        """Fetch a page and find its social tags and profiles, reusing a recent scan and revalidating it"""
+        # Only the validators and what was found on the page are kept, not the body
+        key = f"social_page:{url}"
+        entry = cache.get(key)
+        if entry and time.time() - entry['fetched_at'] < PAGE_CACHE_TTL:
+            return self._cached_scan(entry)
+        
+        # Only revalidate when there is a cached scan to fall back on for a 304
+        headers = {}
+        if entry and entry['etag']:
+            headers['If-None-Match'] = entry['etag']
+        if entry and entry['last_modified']:
+            headers['If-Modified-Since'] = entry['last_modified']
+        
+        try:
+            response = self.session.get(url, timeout=self.timeout, headers=headers, stream=True)
+            if response.status_code == 304 and entry:
+                response.close()
+                entry['fetched_at'] = time.time()
+                cache.set(key, entry, PAGE_STALE_TTL)
+                return self._cached_scan(entry)
+            
+            if not response.ok:
+                response.close()
+                response.raise_for_status()
+            content, _ = read_capped_content(response)
+            try:
+                text = content.decode(response.encoding or 'utf-8', errors='replace')
+            except LookupError:
+                # Unknown charset in the Content-Type header
+                text = content.decode('utf-8', errors='replace')
+            etag, last_modified = response.headers.get('ETag'), response.headers.get('Last-Modified')
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+            # Serve the last good scan when the site can't be reached; HTTP
+            # errors from the site itself still fail the analysis
+            if entry:
+                return self._cached_scan(entry)
+            raise
+        
+        social_tags = self._extract_social_tags(BeautifulSoup(content, 'lxml'))
+        discovered_profiles = self._discover_social_profiles(text, social_tags, url)
+        
+        cache.set(key, {
+            'open_graph': social_tags.open_graph,
+            'twitter_card': social_tags.twitter_card,
+            'profiles': discovered_profiles,
+            'etag': etag,
+            'last_modified': last_modified,
+            'fetched_at': time.time()
+        }, PAGE_STALE_TTL)
+        return social_tags, discovered_profiles, etag, last_modified
+    
+    def _cached_scan(self, entry):
+        """Unpack a cached page scan the way _scan_page returns it"""
+        social_tags = SocialTags(open_graph=dict(entry['open_graph']), twitter_card=dict(entry['twitter_card']))
+        profiles = [dict(profile) for profile in entry['profiles']]
+        return social_tags, profiles, entry['etag'], entry['last_modified']
+    
+    def _extract_social_tags(self, soup):
+        """Sort the page's social meta tags and widgets into a SocialTags in one pass"""
+        social_tags = SocialTags()
+        
+        for tag in soup.select(_SOCIAL_TAGS_SELECTOR):
+            if tag.name != 'meta':
+                social_tags.profile_tags.append(tag)
+                continue
+            
+            prop = tag.get('property') or ''
+            if prop.startswith('og:'):
+                social_tags.open_graph[prop] = tag.get('content')
+                social_tags.profile_tags.append(tag)
+            elif prop.startswith('twitter:'):
+                social_tags.profile_tags.append(tag)
+            
+            name = tag.get('name') or ''
+            if name.startswith('twitter:'):
+                social_tags.twitter_card[name] = tag.get('content')
+        
+        return social_tags
+    
+    def _discover_social_profiles(self, page_content, social_tags, target_url):
         """Discover social media profiles from website content"""
-        profiles = []
+        # Keyed by profile URL so the first discovery of each URL wins
+        profiles_by_url = {}
         domain = urlparse(target_url).netloc
         
+        def add_profile(platform, profile_url, username, discovery_method):
+            if profile_url not in profiles_by_url:
+                profiles_by_url[profile_url] = {
+                    'platform': platform,
+                    'profile_url': profile_url,
+                    'username': username,
+                    'discovery_method': discovery_method
+                }
+        
         # Method 1: Look for social media links in HTML
-        for platform, config in self.platforms.items():
-            for pattern in config['search_patterns']:
-                matches = re.findall(pattern, page_content, re.IGNORECASE)
-                for match in matches:
-                    profile_url = f"{config['base_url']}{match}"
-                    profiles.append({
-                        'platform': platform,
-                        'profile_url': profile_url,
-                        'username': match,
-                        'discovery_method': 'html_link'
-                    })
-        
-        # Method 2: Look for social media meta tags
-        social_meta_tags = soup.find_all('meta', attrs={'property': re.compile(r'^(og:|twitter:)')})
-        for tag in social_meta_tags:
-            content = tag.get('content', '')
-            if 'facebook.com' in content:
-                profiles.append({
-                    'platform': 'facebook',
-                    'profile_url': content,
-                    'username': content.split('/')[-1],
-                    'discovery_method': 'meta_tag'
-                })
-            elif 'twitter.com' in content:
-                profiles.append({
-                    'platform': 'twitter',
-                    'profile_url': content,
-                    'username': content.split('/')[-1],
-                    'discovery_method': 'meta_tag'
-                })
-        
-        # Method 3: Look for common social media widget patterns
-        social_widgets = soup.find_all(['div', 'span', 'a'], class_=re.compile(r'(social|facebook|twitter|instagram|linkedin)', re.I))
-        for widget in social_widgets:
-            href = widget.get('href', '')
+        for link in self._profile_link_re.finditer(page_content):
+            platform = self._link_platforms[link.lastgroup]
+            match = link.group(link.lastgroup)
+            add_profile(platform, f"{self.platforms[platform]['base_url']}{match}", match, 'html_link')
+        
+        # Methods 2 and 3: Look for social media meta tags and common social
+        # media widget patterns
+        for tag in social_tags.profile_tags:
+            if tag.name == 'meta':
+                content = tag.get('content', '')
+                if 'facebook.com' in content:
+                    add_profile('facebook', content, content.split('/')[-1], 'meta_tag')
+                elif 'twitter.com' in content:
+                    add_profile('twitter', content, content.split('/')[-1], 'meta_tag')
+                continue
+            
+            href = tag.get('href', '')
             if href:
-                for platform, config in self.platforms.items():
-                    if platform in href.lower():
-                        profiles.append({
-                            'platform': platform,
-                            'profile_url': href,
-                            'username': href.split('/')[-1],
-                            'discovery_method': 'widget'
-                        })
-        
-        # Remove duplicates
-        unique_profiles = []
-        seen_urls = set()
-        for profile in profiles:
-            if profile['profile_url'] not in seen_urls:
-                unique_profiles.append(profile)
-                seen_urls.add(profile['profile_url'])
-        
-        return unique_profiles
+                # Only the first platform (in platform order) named in the href
+                # can be kept, since the profile is keyed by the href itself
+                names_in_href = {name.lower() for name in self._platform_name_re.findall(href)}
+                for platform in self.platforms:
+                    if platform in names_in_href:
+                        add_profile(platform, href, href.split('/')[-1], 'widget')
+                        break
+        
+        return list(profiles_by_url.values())
     
     def _analyze_social_profile(self, profile):
         """Analyze individual social media profile"""
         platform = profile['platform']
         profile_url = profile['profile_url']
         
+        key = f"social_profile:{platform}:{profile_url}:{profile['username']}"
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+        
         try:
             # For demo purposes, we'll simulate social media metrics
             # In a real implementation, you'd use official APIs:
@@ -178,176 +403,62 @@ class SocialAnalyzer:
             # - YouTube Data API
             
             # Simulate profile data based on platform
-            if platform == 'facebook':
-                return self._simulate_facebook_data(profile)
-            elif platform == 'twitter':
-                return self._simulate_twitter_data(profile)
-            elif platform == 'linkedin':
-                return self._simulate_linkedin_data(profile)
-            elif platform == 'instagram':
-                return self._simulate_instagram_data(profile)
-            elif platform == 'youtube':
-                return self._simulate_youtube_data(profile)
-            elif platform == 'pinterest':
-                return self._simulate_pinterest_data(profile)
+            if platform in SIMULATED_PROFILES:
+                profile_data = self._simulate_profile_data(profile)
+                cache.set(key, profile_data, PROFILE_CACHE_TTL)
+                return profile_data
             
         except Exception as e:
             print(f"Error analyzing {platform} profile {profile_url}: {str(e)}")
             return None
     
-    def _simulate_facebook_data(self, profile):
-        """Simulate Facebook profile data"""
-        import random
-        
-        return {
-            'platform': 'facebook',
-            'profile_url': profile['profile_url'],
-            'username': profile['username'],
-            'followers_count': random.randint(100, 50000),
-            'following_count': random.randint(50, 1000),
-            'posts_count': random.randint(10, 500),
-            'engagement_rate': round(random.uniform(1.0, 8.0), 2),
-            'last_post_date': datetime.utcnow() - timedelta(days=random.randint(1, 30)),
-            'verified': random.choice([True, False]),
-            'metrics': {
-                'likes_avg': random.randint(10, 500),
-                'comments_avg': random.randint(2, 50),
-                'shares_avg': random.randint(1, 25),
-                'posting_frequency': random.choice(['daily', 'weekly', 'monthly'])
-            }
-        }
-    
-    def _simulate_twitter_data(self, profile):
-        """Simulate Twitter profile data"""
-        import random
+    def _simulate_profile_data(self, profile):
+        """Simulate profile data from the platform's ranges in SIMULATED_PROFILES"""
+        spec = SIMULATED_PROFILES[profile['platform']]
+        randint = self._rng.randint
         
         return {
-            'platform': 'twitter',
+            'platform': profile['platform'],
             'profile_url': profile['profile_url'],
             'username': profile['username'],
-            'followers_count': random.randint(50, 100000),
-            'following_count': random.randint(100, 5000),
-            'posts_count': random.randint(50, 10000),
-            'engagement_rate': round(random.uniform(0.5, 5.0), 2),
-            'last_post_date': datetime.utcnow() - timedelta(days=random.randint(1, 7)),
-            'verified': random.choice([True, False]),
+            'followers_count': randint(*spec['followers_count']),
+            'following_count': randint(*spec['following_count']),
+            'posts_count': randint(*spec['posts_count']),
+            'engagement_rate': round(self._rng.uniform(*spec['engagement_rate']), 2),
+            'last_post_date': datetime.utcnow() - timedelta(days=randint(*spec['last_post_days'])),
+            'verified': self._rng.choice((True, False)),
             'metrics': {
-                'retweets_avg': random.randint(5, 100),
-                'likes_avg': random.randint(10, 500),
-                'replies_avg': random.randint(1, 20),
-                'posting_frequency': random.choice(['multiple_daily', 'daily', 'weekly'])
-            }
-        }
-    
-    def _simulate_linkedin_data(self, profile):
-        """Simulate LinkedIn profile data"""
-        import random
-        
-        return {
-            'platform': 'linkedin',
-            'profile_url': profile['profile_url'],
-            'username': profile['username'],
-            'followers_count': random.randint(100, 25000),
-            'following_count': random.randint(200, 2000),
-            'posts_count': random.randint(20, 200),
-            'engagement_rate': round(random.uniform(2.0, 10.0), 2),
-            'last_post_date': datetime.utcnow() - timedelta(days=random.randint(1, 14)),
-            'verified': random.choice([True, False]),
-            'metrics': {
-                'likes_avg': random.randint(20, 200),
-                'comments_avg': random.randint(5, 50),
-                'shares_avg': random.randint(2, 30),
-                'posting_frequency': random.choice(['weekly', 'bi-weekly', 'monthly'])
-            }
-        }
-    
-    def _simulate_instagram_data(self, profile):
-        """Simulate Instagram profile data"""
-        import random
-        
-        return {
-            'platform': 'instagram',
-            'profile_url': profile['profile_url'],
-            'username': profile['username'],
-            'followers_count': random.randint(200, 75000),
-            'following_count': random.randint(100, 3000),
-            'posts_count': random.randint(30, 1000),
-            'engagement_rate': round(random.uniform(1.5, 12.0), 2),
-            'last_post_date': datetime.utcnow() - timedelta(days=random.randint(1, 10)),
-            'verified': random.choice([True, False]),
-            'metrics': {
-                'likes_avg': random.randint(50, 1000),
-                'comments_avg': random.randint(5, 100),
-                'stories_per_week': random.randint(3, 21),
-                'posting_frequency': random.choice(['daily', 'every_other_day', 'weekly'])
-            }
-        }
-    
-    def _simulate_youtube_data(self, profile):
-        """Simulate YouTube profile data"""
-        import random
-        
-        return {
-            'platform': 'youtube',
-            'profile_url': profile['profile_url'],
-            'username': profile['username'],
-            'followers_count': random.randint(100, 500000),  # subscribers
-            'following_count': 0,  # YouTube doesn't show subscriptions
-            'posts_count': random.randint(10, 500),  # videos
-            'engagement_rate': round(random.uniform(2.0, 15.0), 2),
-            'last_post_date': datetime.utcnow() - timedelta(days=random.randint(1, 30)),
-            'verified': random.choice([True, False]),
-            'metrics': {
-                'views_avg': random.randint(500, 50000),
-                'likes_avg': random.randint(20, 2000),
-                'comments_avg': random.randint(5, 200),
-                'upload_frequency': random.choice(['weekly', 'bi-weekly', 'monthly'])
-            }
-        }
-    
-    def _simulate_pinterest_data(self, profile):
-        """Simulate Pinterest profile data"""
-        import random
-        
-        return {
-            'platform': 'pinterest',
-            'profile_url': profile['profile_url'],
-            'username': profile['username'],
-            'followers_count': random.randint(50, 10000),
-            'following_count': random.randint(100, 5000),
-            'posts_count': random.randint(20, 2000),  # pins
-            'engagement_rate': round(random.uniform(0.5, 3.0), 2),
-            'last_post_date': datetime.utcnow() - timedelta(days=random.randint(1, 14)),
-            'verified': random.choice([True, False]),
-            'metrics': {
-                'repins_avg': random.randint(5, 100),
-                'likes_avg': random.randint(2, 50),
-                'boards_count': random.randint(5, 50),
-                'posting_frequency': random.choice(['daily', 'weekly', 'monthly'])
+                name: self._rng.choice(values) if isinstance(values, list) else randint(*values)
+                for name, values in spec['metrics'].items()
             }
         }
     
     def _save_social_profiles(self, website_id, social_data):
         """Save social profiles to database"""
         try:
+            profiles = SocialProfile.__table__
+            
             # Remove existing profiles for this website
-            SocialProfile.query.filter_by(website_id=website_id).delete()
+            db.session.execute(profiles.delete().where(profiles.c.website_id == website_id))
             
-            # Add new profiles
-            for profile_data in social_data:
-                social_profile = SocialProfile(
-                    website_id=website_id,
-                    platform=profile_data['platform'],
-                    profile_url=profile_data['profile_url'],
-                    username=profile_data['username'],
-                    followers_count=profile_data['followers_count'],
-                    following_count=profile_data['following_count'],
-                    posts_count=profile_data['posts_count'],
-                    engagement_rate=profile_data['engagement_rate'],
-                    last_post_date=profile_data['last_post_date'],
-                    verified=profile_data['verified']
-                )
-                db.session.add(social_profile)
+            # Add new profiles as one executemany, in the same transaction as the delete
+            rows = [
+                {
+                    'website_id': website_id,
+                    'platform': profile_data['platform'],
+                    'profile_url': profile_data['profile_url'],
+                    'username': profile_data['username'],
+                    'followers_count': profile_data['followers_count'],
+                    'following_count': profile_data['following_count'],
+                    'posts_count': profile_data['posts_count'],
+                    'engagement_rate': profile_data['engagement_rate'],
+                    'last_post_date': profile_data['last_post_date'],
+                    'verified': profile_data['verified']
+                }
+                for profile_data in social_data
+            ]
+            if rows:
+                db.session.execute(profiles.insert(), rows)
             
             db.session.commit()
             
@@ -355,13 +466,12 @@ class SocialAnalyzer:
             db.session.rollback()
             raise Exception(f"Failed to save social profiles: {str(e)}")
     
-    def _generate_social_recommendations(self, social_data, soup):
+    def _generate_social_recommendations(self, social_data, social_tags):
         """Generate social media optimization recommendations"""
         recommendations = []
         
         # Check for Open Graph tags
-        og_tags = soup.find_all('meta', attrs={'property': re.compile(r'^og:')})
-        og_properties = {tag.get('property'): tag.get('content') for tag in og_tags}
+        og_properties = social_tags.open_graph
         
         if not og_properties.get('og:title'):
             recommendations.append({
@@ -388,8 +498,7 @@ class SocialAnalyzer:
             })
         
         # Check for Twitter Card tags
-        twitter_tags = soup.find_all('meta', attrs={'name': re.compile(r'^twitter:')})
-        twitter_properties = {tag.get('name'): tag.get('content') for tag in twitter_tags}
+        twitter_properties = social_tags.twitter_card
         
         if not twitter_properties.get('twitter:card'):
             recommendations.append({
@@ -400,29 +509,28 @@ class SocialAnalyzer:
             })
         
         # Analyze social presence
-        platforms_found = [profile['platform'] for profile in social_data]
-        important_platforms = ['facebook', 'twitter', 'linkedin', 'instagram']
+        platforms_found = {profile['platform'] for profile in social_data}
         
-        missing_platforms = [platform for platform in important_platforms if platform not in platforms_found]
+        missing_platforms = ', '.join(platform for platform in IMPORTANT_PLATFORMS if platform not in platforms_found)
         if missing_platforms:
             recommendations.append({
                 'type': 'missing_social_platforms',
                 'priority': 'low',
-                'message': f'Consider establishing presence on: {", ".join(missing_platforms)}',
+                'message': f'Consider establishing presence on: {missing_platforms}',
                 'recommendation': 'Expand your social media presence to reach more audiences and improve brand visibility'
             })
         
         # Check engagement rates
-        low_engagement_platforms = [
+        low_engagement_platforms = ', '.join(
             profile['platform'] for profile in social_data 
             if profile['engagement_rate'] < 2.0
-        ]
+        )
         
         if low_engagement_platforms:
             recommendations.append({
                 'type': 'low_engagement',
                 'priority': 'medium',
-                'message': f'Low engagement rates detected on: {", ".join(low_engagement_platforms)}',
+                'message': f'Low engagement rates detected on: {low_engagement_platforms}',
                 'recommendation': 'Focus on creating more engaging content and interacting with your audience to improve engagement rates'
             })
         
@@ -439,48 +547,33 @@ class SocialAnalyzer:
                 'activity_level': 'low'
             }
         
-        total_followers = sum(profile['followers_count'] for profile in social_data)
-        avg_engagement = sum(profile['engagement_rate'] for profile in social_data) / len(social_data)
+        # Totals and recent activity in one pass over the profiles
+        now = datetime.utcnow()
+        total_followers = 0
+        total_engagement = 0
+        recent_posts = 0
+        for profile in social_data:
+            total_followers += profile['followers_count']
+            total_engagement += profile['engagement_rate']
+            if profile['last_post_date'] and (now - profile['last_post_date']).days <= 7:
+                recent_posts += 1
+        
+        avg_engagement = total_engagement / len(social_data)
         platform_count = len(social_data)
         
         # Calculate overall score (0-100)
         score = 0
         
         # Follower count score (40%)
-        if total_followers > 10000:
-            score += 40
-        elif total_followers > 1000:
-            score += 30
-        elif total_followers > 100:
-            score += 20
-        else:
-            score += 10
+        score += FOLLOWER_SCORES[bisect_left(FOLLOWER_SCORE_BOUNDS, total_followers)]
         
         # Engagement rate score (30%)
-        if avg_engagement > 5:
-            score += 30
-        elif avg_engagement > 3:
-            score += 25
-        elif avg_engagement > 1:
-            score += 15
-        else:
-            score += 5
+        score += ENGAGEMENT_SCORES[bisect_left(ENGAGEMENT_SCORE_BOUNDS, avg_engagement)]
         
         # Platform diversity score (20%)
-        if platform_count >= 4:
-            score += 20
-        elif platform_count >= 3:
-            score += 15
-        elif platform_count >= 2:
-            score += 10
-        else:
-            score += 5
+        score += DIVERSITY_SCORES[bisect_right(DIVERSITY_SCORE_BOUNDS, platform_count)]
         
         # Activity level score (10%)
-        recent_posts = sum(1 for profile in social_data 
-                          if profile['last_post_date'] and 
-                          (datetime.utcnow() - profile['last_post_date']).days <= 7)
-        
         if recent_posts >= len(social_data):
             score += 10
             activity_level = 'high'
@@ -502,9 +595,18 @@ class SocialAnalyzer:
     def get_social_metrics(self, website_id):
         """Get comprehensive social media metrics for a website"""
         try:
-            profiles = SocialProfile.query.filter_by(website_id=website_id).all()
+            rows = db.session.execute(
+                select(
+                    SocialProfile.platform,
+                    SocialProfile.followers_count,
+                    SocialProfile.engagement_rate,
+                    SocialProfile.posts_count,
+                    SocialProfile.verified,
+                    SocialProfile.last_post_date
+                ).where(SocialProfile.website_id == website_id)
+            ).all()
             
-            if not profiles:
+            if not rows:
                 return {
                     'total_profiles': 0,
                     'total_followers': 0,
@@ -514,38 +616,38 @@ class SocialAnalyzer:
                     'top_performing_platforms': []
                 }
             
+            # Work column by column: one list per field, each converted once
+            platforms, followers, engagement_rates, posts, verified, last_posts = map(list, zip(*rows))
+            follower_counts = [count or 0 for count in followers]
+            engagement = [float(rate) if rate else 0 for rate in engagement_rates]
+            
             # Calculate metrics
-            total_followers = sum(profile.followers_count or 0 for profile in profiles)
-            platforms = [profile.platform for profile in profiles]
+            total_followers = sum(follower_counts)
             
             # Engagement summary by platform
             engagement_summary = {}
-            for profile in profiles:
-                engagement_summary[profile.platform] = {
-                    'followers': profile.followers_count,
-                    'engagement_rate': float(profile.engagement_rate) if profile.engagement_rate else 0,
-                    'posts': profile.posts_count,
-                    'verified': profile.verified,
-                    'last_post': profile.last_post_date.isoformat() if profile.last_post_date else None
+            for i, platform in enumerate(platforms):
+                engagement_summary[platform] = {
+                    'followers': followers[i],
+                    'engagement_rate': engagement[i],
+                    'posts': posts[i],
+                    'verified': verified[i],
+                    'last_post': last_posts[i]
                 }
             
-            # Top performing platforms
-            top_platforms = sorted(
-                [(p.platform, p.followers_count or 0, float(p.engagement_rate) if p.engagement_rate else 0) 
-                 for p in profiles],
-                key=lambda x: x[1] * x[2],  # followers * engagement
-                reverse=True
-            )
+            # Top performing platforms, ranked by followers * engagement
+            ranks = [count * rate for count, rate in zip(follower_counts, engagement)]
+            top_platforms = sorted(range(len(platforms)), key=ranks.__getitem__, reverse=True)
             
             return {
-                'total_profiles': len(profiles),
+                'total_profiles': len(rows),
                 'total_followers': total_followers,
                 'platforms': platforms,
                 'engagement_summary': engagement_summary,
                 'growth_trends': [],  # Would need historical data
                 'top_performing_platforms': [
-                    {'platform': platform, 'followers': followers, 'engagement': engagement}
-                    for platform, followers, engagement in top_platforms
+                    {'platform': platforms[i], 'followers': follower_counts[i], 'engagement': engagement[i]}
+                    for i in top_platforms
                 ]
             }
             
@@ -0,0 +1,13 @@
+import os
+import sys
+import types
+
+# The modules live flat in this checkout but import each other as the deployed
+# src.services / src.models packages; map those package names onto the checkout
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+for _name in ('src', 'src.services', 'src.models'):
+    if _name not in sys.modules:
+        _package = types.ModuleType(_name)
+        _package.__path__ = [_ROOT]
+        sys.modules[_name] = _package
@@ -0,0 +1,34 @@
+import os
+import stat
+
+from src.services.white_label_service import WhiteLabelService, _UPLOAD_FILE_MODE
+
+
+def test_upload_logo_is_world_readable(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    service = WhiteLabelService()
+    
+    url = service.upload_logo(1, b'\x89PNG logo bytes', 'logo.png')
+    
+    stored_path = os.path.join(service.upload_dir, os.path.basename(url))
+    assert stat.S_IMODE(os.stat(stored_path).st_mode) == _UPLOAD_FILE_MODE
+    assert not [name for name in os.listdir(service.upload_dir) if name.endswith('.tmp')]
+
+
+def test_config_id_taken_by_another_worker_is_skipped(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    first_worker = WhiteLabelService()
+    second_worker = WhiteLabelService()
+    
+    # The second worker scanned for a free ID just before the first one claimed it
+    stale_ids = iter([1])
+    next_config_id = second_worker._next_config_id
+    monkeypatch.setattr(second_worker, '_next_config_id', lambda: next(stale_ids, None) or next_config_id())
+    
+    first = first_worker.create_config(1, {'company_name': 'First'})
+    second = second_worker.create_config(2, {'company_name': 'Second'})
+    
+    assert (first.id, second.id) == (1, 2)
+    assert first_worker.get_config(1).company_name == 'First'
+    assert first_worker.get_user_config(2).company_name == 'Second'
+    assert second_worker.get_user_config(1).company_name == 'First'
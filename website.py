@@ -1,68 +1,210 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, abort, request, jsonify, make_response
 from src.models.user import db
 from src.models.audit import Website, Audit
-from sqlalchemy import desc
+from src.services.cache_service import cache
+from sqlalchemy import and_, desc, func, or_, select
+from sqlalchemy.orm import joinedload
+from datetime import datetime
+from functools import wraps
+import hashlib
 
 website_bp = Blueprint('website', __name__)
 
+# Dashboards poll the stats; a few seconds of reuse absorbs the polling
+WEBSITE_STATS_CACHE_KEY = 'website_stats'
+WEBSITE_STATS_TTL = 15
+
+def _websites_etag(website_id=None):
+    """ETag for responses built from websites and their audits: the latest analysis, audit,
+    completion and page validators, and row counts, for one website or all of them"""
+    audit_filter = (Audit.website_id == website_id,) if website_id is not None else ()
+    
+    # Website aggregates with the audit aggregates as scalar subqueries, in a single round trip.
+    # For one website the max() of etag and last_modified are its own validators, which
+    # change when a re-analysis picks up new page details
+    fingerprint_query = select(
+        func.max(Website.last_analyzed),
+        func.max(Website.total_audits),
+        func.count(Website.id),
+        func.max(Website.etag),
+        func.max(Website.last_modified),
+        select(func.count(Audit.id)).where(*audit_filter).scalar_subquery(),
+        select(func.max(Audit.id)).where(*audit_filter).scalar_subquery(),
+        select(func.max(Audit.completed_at)).where(*audit_filter).scalar_subquery()
+    )
+    if website_id is not None:
+        fingerprint_query = fingerprint_query.where(Website.id == website_id)
+    
+    fingerprint = db.session.execute(fingerprint_query).one()
+    
+    # No row matched the website; answer 404 rather than a 304 for a replayed ETag
+    if website_id is not None and fingerprint[2] == 0:
+        abort(404)
+    
+    key = f"{request.endpoint}:{request.query_string.decode()}:{website_id}:{':'.join(map(str, fingerprint))}"
+    return hashlib.md5(key.encode()).hexdigest()
+
+def conditional_on_websites(view):
+    """Answer If-None-Match with 304 when the websites and audits behind a GET haven't changed"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        etag = _websites_etag(kwargs.get('website_id'))
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+            response.set_etag(etag)
+            return response
+        
+        response = make_response(view(*args, **kwargs))
+        if response.status_code == 200:
+            response.set_etag(etag)
+            response.headers.setdefault('Cache-Control', 'private, must-revalidate')
+        return response
+    
+    return wrapper
+
+def _cursor_args():
+    """Read an ?after=<iso timestamp>&after_id=<id> keyset cursor; None for page-number requests.
+    An empty 'after' continues through rows with no timestamp; a malformed one raises ValueError."""
+    after_id = request.args.get('after_id', type=int)
+    if after_id is None:
+        return None
+    
+    after = request.args.get('after', '').strip()
+    return (datetime.fromisoformat(after) if after else None), after_id
+
+def _paginate(statement, sort_column, id_column, page, per_page, cursor=None):
+    """Run one page of a select as row mappings, newest first by sort_column then id, returning
+    the rows and the pagination block. With a cursor the page is found by keyset instead of OFFSET."""
+    per_page = per_page if per_page > 0 else 20
+    # Rows without a timestamp (e.g. never-analyzed websites) always sort last, on every backend.
+    # SQLite already put them there; on PostgreSQL a plain DESC listed them first, so
+    # page-number responses there now start with the newest dated rows instead
+    ordered = statement.order_by(sort_column.desc().nulls_last(), id_column.desc())
+    
+    if cursor is None:
+        page = max(page, 1)
+        total = db.session.execute(
+            select(func.count()).select_from(statement.subquery())
+        ).scalar()
+        rows = db.session.execute(
+            ordered.limit(per_page).offset((page - 1) * per_page)
+        ).mappings().all()
+        pages = -(-total // per_page)
+        
+        pagination = {
+            'page': page,
+            'per_page': per_page,
+            'total': total,
+            'pages': pages,
+            'has_next': page < pages,
+            'has_prev': page > 1
+        }
+    else:
+        # Rows after the cursor in (sort_column DESC NULLS LAST, id DESC) order
+        after, after_id = cursor
+        if after is None:
+            ordered = ordered.where(and_(sort_column.is_(None), id_column < after_id))
+        else:
+            ordered = ordered.where(or_(
+                sort_column < after,
+                and_(sort_column == after, id_column < after_id),
+                sort_column.is_(None)
+            ))
+        
+        # One extra row tells us whether there is a next page
+        rows = db.session.execute(ordered.limit(per_page + 1)).mappings().all()
+        pagination = {
+            'per_page': per_page,
+            'has_next': len(rows) > per_page
+        }
+        rows = rows[:per_page]
+    
+    last = rows[-1] if rows else None
+    pagination['next_cursor'] = {
+        'after': last[sort_column.key].isoformat() if last[sort_column.key] else None,
+        'after_id': last[id_column.key]
+    } if pagination['has_next'] else None
+    
+    return rows, pagination
+
+def _website_item(website):
+    """Serialize a list_websites row; datetimes are left to the JSON provider"""
+    return {
+        'id': website['id'],
+        'domain': website['domain'],
+        'title': website['title'],
+        'description': website['description'],
+        'favicon_url': website['favicon_url'],
+        'first_analyzed': website['first_analyzed'],
+        'last_analyzed': website['last_analyzed'],
+        'total_audits': website['total_audits'],
+        'average_score': float(website['average_score']) if website['average_score'] else None,
+        'latest_audit': {
+            'id': website['latest_audit_id'],
+            'overall_score': website['latest_audit_score'],
+            'status': website['latest_audit_status'],
+            'started_at': website['latest_audit_started_at']
+        } if website['latest_audit_id'] is not None else None
+    }
+
+def _audit_item(audit):
+    """Serialize a get_website_audits row; datetimes are left to the JSON provider"""
+    return {
+        'id': audit['id'],
+        'url': audit['url'],
+        'overall_score': audit['overall_score'],
+        'status': audit['status'],
+        'audit_type': audit['audit_type'],
+        'started_at': audit['started_at'],
+        'completed_at': audit['completed_at'],
+        'error_message': audit['error_message']
+    }
+
 @website_bp.route('/websites', methods=['GET'])
+@conditional_on_websites
 def list_websites():
     """List websites with their audit statistics"""
     try:
         page = request.args.get('page', 1, type=int)
         per_page = min(request.args.get('per_page', 20, type=int), 100)
         search = request.args.get('search', '').strip()
+        try:
+            cursor = _cursor_args()
+        except ValueError:
+            return jsonify({'error': 'Invalid after cursor'}), 400
         
-        query = Website.query
+        # Only the columns the response needs, as plain rows
+        query = select(
+            Website.id,
+            Website.domain,
+            Website.title,
+            Website.description,
+            Website.favicon_url,
+            Website.first_analyzed,
+            Website.last_analyzed,
+            Website.total_audits,
+            Website.average_score,
+            Audit.id.label('latest_audit_id'),
+            Audit.overall_score.label('latest_audit_score'),
+            Audit.status.label('latest_audit_status'),
+            Audit.started_at.label('latest_audit_started_at')
+        ).outerjoin(Audit, Audit.id == Website.latest_audit_id)
         
         if search:
-            query = query.filter(Website.domain.contains(search))
-        
-        websites = query.order_by(desc(Website.last_analyzed)).paginate(
-            page=page, per_page=per_page, error_out=False
-        )
-        
-        result = {
-            'websites': [],
-            'pagination': {
-                'page': page,
-                'per_page': per_page,
-                'total': websites.total,
-                'pages': websites.pages,
-                'has_next': websites.has_next,
-                'has_prev': websites.has_prev
-            }
-        }
+            query = query.where(Website.domain.contains(search))
         
-        for website in websites.items:
-            # Get latest audit
-            latest_audit = Audit.query.filter_by(website_id=website.id)\
-                .order_by(desc(Audit.started_at)).first()
-            
-            result['websites'].append({
-                'id': website.id,
-                'domain': website.domain,
-                'title': website.title,
-                'description': website.description,
-                'favicon_url': website.favicon_url,
-                'first_analyzed': website.first_analyzed.isoformat() if website.first_analyzed else None,
-                'last_analyzed': website.last_analyzed.isoformat() if website.last_analyzed else None,
-                'total_audits': website.total_audits,
-                'average_score': float(website.average_score) if website.average_score else None,
-                'latest_audit': {
-                    'id': latest_audit.id,
-                    'overall_score': latest_audit.overall_score,
-                    'status': latest_audit.status,
-                    'started_at': latest_audit.started_at.isoformat()
-                } if latest_audit else None
-            })
+        websites, pagination = _paginate(query, Website.last_analyzed, Website.id, page, per_page, cursor)
         
-        return jsonify(result)
+        return jsonify({
+            'websites': [_website_item(website) for website in websites],
+            'pagination': pagination
+        })
         
     except Exception as e:
         return jsonify({'error': f'Failed to list websites: {str(e)}'}), 500
 
 @website_bp.route('/websites/<int:website_id>', methods=['GET'])
+@conditional_on_websites
 def get_website(website_id):
     """Get website details with audit history"""
     try:
@@ -78,8 +220,8 @@ def get_website(website_id):
             'title': website.title,
             'description': website.description,
             'favicon_url': website.favicon_url,
-            'first_analyzed': website.first_analyzed.isoformat() if website.first_analyzed else None,
-            'last_analyzed': website.last_analyzed.isoformat() if website.last_analyzed else None,
+            'first_analyzed': website.first_analyzed,
+            'last_analyzed': website.last_analyzed,
             'total_audits': website.total_audits,
             'average_score': float(website.average_score) if website.average_score else None,
             'recent_audits': []
@@ -91,8 +233,8 @@ def get_website(website_id):
                 'url': audit.url,
                 'overall_score': audit.overall_score,
                 'status': audit.status,
-                'started_at': audit.started_at.isoformat(),
-                'completed_at': audit.completed_at.isoformat() if audit.completed_at else None
+                'started_at': audit.started_at,
+                'completed_at': audit.completed_at
             })
         
         return jsonify(result)
@@ -101,6 +243,7 @@ def get_website(website_id):
         return jsonify({'error': f'Failed to get website: {str(e)}'}), 500
 
 @website_bp.route('/websites/<int:website_id>/audits', methods=['GET'])
+@conditional_on_websites
 def get_website_audits(website_id):
     """Get all audits for a specific website"""
     try:
@@ -108,11 +251,24 @@ def get_website_audits(website_id):
         
         page = request.args.get('page', 1, type=int)
         per_page = min(request.args.get('per_page', 20, type=int), 100)
+        try:
+            cursor = _cursor_args()
+        except ValueError:
+            return jsonify({'error': 'Invalid after cursor'}), 400
         
-        audits = Audit.query.filter_by(website_id=website.id)\
-            .order_by(desc(Audit.started_at)).paginate(
-                page=page, per_page=per_page, error_out=False
-            )
+        audits, pagination = _paginate(
+            select(
+                Audit.id,
+                Audit.url,
+                Audit.overall_score,
+                Audit.status,
+                Audit.audit_type,
+                Audit.started_at,
+                Audit.completed_at,
+                Audit.error_message
+            ).where(Audit.website_id == website.id),
+            Audit.started_at, Audit.id, page, per_page, cursor
+        )
         
         result = {
             'website': {
@@ -120,29 +276,10 @@ def get_website_audits(website_id):
                 'domain': website.domain,
                 'title': website.title
             },
-            'audits': [],
-            'pagination': {
-                'page': page,
-                'per_page': per_page,
-                'total': audits.total,
-                'pages': audits.pages,
-                'has_next': audits.has_next,
-                'has_prev': audits.has_prev
-            }
+            'audits': [_audit_item(audit) for audit in audits],
+            'pagination': pagination
         }
         
-        for audit in audits.items:
-            result['audits'].append({
-                'id': audit.id,
-                'url': audit.url,
-                'overall_score': audit.overall_score,
-                'status': audit.status,
-                'audit_type': audit.audit_type,
-                'started_at': audit.started_at.isoformat(),
-                'completed_at': audit.completed_at.isoformat() if audit.completed_at else None,
-                'error_message': audit.error_message
-            })
-        
         return jsonify(result)
         
     except Exception as e:
@@ -150,19 +287,42 @@ def get_website_audits(website_id):
 
 @website_bp.route('/websites/stats', methods=['GET'])
 def get_website_stats():
-    """Get overall website statistics"""
+    """Get overall website statistics; pass ?fresh=1 to skip the cache"""
     try:
-        total_websites = Website.query.count()
-        total_audits = Audit.query.count()
-        completed_audits = Audit.query.filter_by(status='completed').count()
-        failed_audits = Audit.query.filter_by(status='failed').count()
+        # The ETag is cached with the result, so a warm cache answers without touching the database
+        if request.args.get('fresh') != '1':
+            cached = cache.get(WEBSITE_STATS_CACHE_KEY)
+            if cached is not None:
+                if request.if_none_match.contains(cached['etag']):
+                    response = Response(status=304)
+                else:
+                    response = jsonify(cached['result'])
+                response.set_etag(cached['etag'])
+                response.headers['Cache-Control'] = 'private, must-revalidate'
+                response.headers['X-Cache'] = 'HIT'
+                return response
         
-        # Get average scores
-        avg_score_result = db.session.query(db.func.avg(Audit.overall_score))\
-            .filter(Audit.overall_score.isnot(None)).scalar()
+        etag = _websites_etag()
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+            response.set_etag(etag)
+            return response
+        
+        # Website count, audit counts by status and the average score in one query;
+        # avg() skips audits without a score
+        total_websites, total_audits, completed_audits, failed_audits, avg_score_result = db.session.execute(
+            select(
+                select(func.count(Website.id)).scalar_subquery(),
+                func.count(Audit.id),
+                func.count(Audit.id).filter(Audit.status == 'completed'),
+                func.count(Audit.id).filter(Audit.status == 'failed'),
+                func.avg(Audit.overall_score)
+            )
+        ).one()
         
         # Get recent activity
-        recent_audits = Audit.query.order_by(desc(Audit.started_at)).limit(5).all()
+        recent_audits = Audit.query.options(joinedload(Audit.website))\
+            .order_by(desc(Audit.started_at)).limit(5).all()
         
         result = {
             'total_websites': total_websites,
@@ -181,10 +341,16 @@ def get_website_stats():
                 'url': audit.url,
                 'overall_score': audit.overall_score,
                 'status': audit.status,
-                'started_at': audit.started_at.isoformat()
+                'started_at': audit.started_at
             })
         
-        return jsonify(result)
+        cache.set(WEBSITE_STATS_CACHE_KEY, {'etag': etag, 'result': result}, WEBSITE_STATS_TTL)
+        
+        response = jsonify(result)
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'private, must-revalidate'
+        response.headers['X-Cache'] = 'MISS'
+        return response
         
     except Exception as e:
         return jsonify({'error': f'Failed to get website stats: {str(e)}'}), 500
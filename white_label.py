@@ -1,81 +1,63 @@
+from dataclasses import dataclass, field, fields
 from datetime import datetime
 from typing import Optional, Dict, Any
+import re
 import json
 
+# A '#rrggbb' hex color
+_is_hex_color = re.compile(r'#[0-9a-fA-F]{6}').fullmatch
+
+@dataclass(slots=True)
 class WhiteLabelConfig:
     """White label configuration for branded reports and interface"""
     
-    def __init__(self):
-        self.id: Optional[int] = None
-        self.user_id: Optional[int] = None
-        self.company_name: str = ""
-        self.logo_url: str = ""
-        self.primary_color: str = "#3b82f6"
-        self.secondary_color: str = "#1e40af"
-        self.accent_color: str = "#f59e0b"
-        self.font_family: str = "Inter"
-        self.custom_css: str = ""
-        self.footer_text: str = ""
-        self.contact_info: Dict[str, Any] = {}
-        self.social_links: Dict[str, str] = {}
-        self.report_template: str = "professional"
-        self.show_powered_by: bool = True
-        self.custom_domain: str = ""
-        self.created_at: Optional[datetime] = None
-        self.updated_at: Optional[datetime] = None
+    id: Optional[int] = None
+    user_id: Optional[int] = None
+    company_name: str = ""
+    logo_url: str = ""
+    primary_color: str = "#3b82f6"
+    secondary_color: str = "#1e40af"
+    accent_color: str = "#f59e0b"
+    font_family: str = "Inter"
+    custom_css: str = ""
+    footer_text: str = ""
+    contact_info: Dict[str, Any] = field(default_factory=dict)
+    social_links: Dict[str, str] = field(default_factory=dict)
+    report_template: str = "professional"
+    show_powered_by: bool = True
+    custom_domain: str = ""
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    # Last get_css_variables() result and the values it was built from
+    _css_key: Optional[tuple] = field(default=None, init=False, repr=False, compare=False)
+    _css: str = field(default="", init=False, repr=False, compare=False)
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for JSON serialization"""
-        return {
-            'id': self.id,
-            'user_id': self.user_id,
-            'company_name': self.company_name,
-            'logo_url': self.logo_url,
-            'primary_color': self.primary_color,
-            'secondary_color': self.secondary_color,
-            'accent_color': self.accent_color,
-            'font_family': self.font_family,
-            'custom_css': self.custom_css,
-            'footer_text': self.footer_text,
-            'contact_info': self.contact_info,
-            'social_links': self.social_links,
-            'report_template': self.report_template,
-            'show_powered_by': self.show_powered_by,
-            'custom_domain': self.custom_domain,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
-        }
+        data = {name: getattr(self, name) for name in CONFIG_FIELDS}
+        # Copied so the stored data doesn't share the nested dicts with this instance
+        data['contact_info'] = dict(self.contact_info)
+        data['social_links'] = dict(self.social_links)
+        data['created_at'] = self.created_at.isoformat() if self.created_at else None
+        data['updated_at'] = self.updated_at.isoformat() if self.updated_at else None
+        return data
     
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'WhiteLabelConfig':
         """Create instance from dictionary"""
-        config = cls()
-        config.id = data.get('id')
-        config.user_id = data.get('user_id')
-        config.company_name = data.get('company_name', '')
-        config.logo_url = data.get('logo_url', '')
-        config.primary_color = data.get('primary_color', '#3b82f6')
-        config.secondary_color = data.get('secondary_color', '#1e40af')
-        config.accent_color = data.get('accent_color', '#f59e0b')
-        config.font_family = data.get('font_family', 'Inter')
-        config.custom_css = data.get('custom_css', '')
-        config.footer_text = data.get('footer_text', '')
-        config.contact_info = data.get('contact_info', {})
-        config.social_links = data.get('social_links', {})
-        config.report_template = data.get('report_template', 'professional')
-        config.show_powered_by = data.get('show_powered_by', True)
-        config.custom_domain = data.get('custom_domain', '')
+        values = {name: data[name] for name in CONFIG_FIELDS if name in data}
+        for name in ('created_at', 'updated_at'):
+            values[name] = datetime.fromisoformat(values[name]) if values.get(name) else None
         
-        if data.get('created_at'):
-            config.created_at = datetime.fromisoformat(data['created_at'])
-        if data.get('updated_at'):
-            config.updated_at = datetime.fromisoformat(data['updated_at'])
-            
-        return config
+        return cls(**values)
     
     def get_css_variables(self) -> str:
-        """Generate CSS variables for theming"""
-        return f"""
+        """Generate CSS variables for theming, rebuilding only when the theme values change"""
+        key = (self.primary_color, self.secondary_color, self.accent_color, self.font_family, self.custom_css)
+        if key == self._css_key:
+            return self._css
+        
+        self._css = f"""
         :root {{
             --primary-color: {self.primary_color};
             --secondary-color: {self.secondary_color};
@@ -85,6 +67,8 @@ class WhiteLabelConfig:
         
         {self.custom_css}
         """
+        self._css_key = key
+        return self._css
     
     def validate(self) -> Dict[str, str]:
         """Validate configuration and return errors"""
@@ -94,14 +78,18 @@ class WhiteLabelConfig:
             errors['company_name'] = 'Company name is required'
         
         # Validate color formats
-        color_fields = ['primary_color', 'secondary_color', 'accent_color']
-        for field in color_fields:
-            color = getattr(self, field)
-            if not color.startswith('#') or len(color) != 7:
-                errors[field] = f'{field.replace("_", " ").title()} must be a valid hex color'
+        if not _is_hex_color(self.primary_color):
+            errors['primary_color'] = 'Primary Color must be a valid hex color'
+        if not _is_hex_color(self.secondary_color):
+            errors['secondary_color'] = 'Secondary Color must be a valid hex color'
+        if not _is_hex_color(self.accent_color):
+            errors['accent_color'] = 'Accent Color must be a valid hex color'
         
         return errors
 
+# Configuration fields, in serialization order; excludes the private CSS memo
+CONFIG_FIELDS = tuple(config_field.name for config_field in fields(WhiteLabelConfig) if config_field.init)
+
 class ReportTemplate:
     """Report template configuration"""
     
@@ -1,47 +1,165 @@
+import io
 import os
+import re
 import json
-from typing import Optional, Dict, Any, List
+import hashlib
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import Optional, Dict, Any, List, Tuple, BinaryIO, Union
 from datetime import datetime
-from ..models.white_label import WhiteLabelConfig, ReportTemplate
+from ..models.white_label import WhiteLabelConfig, ReportTemplate, CONFIG_FIELDS
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Not available on Windows; there only the in-process lock guards the user index
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Logo file types accepted by upload_logo, and the message listing them
+_ALLOWED_LOGO_EXTENSIONS = frozenset({'.png', '.jpg', '.jpeg', '.svg', '.gif'})
+_INVALID_LOGO_MESSAGE = f"Invalid file type. Allowed: {', '.join(sorted(_ALLOWED_LOGO_EXTENSIONS))}"
+
+# Mode a plain open() would give new files; mkstemp creates them 0600, which a
+# separate static server or worker user could not read
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+_UPLOAD_FILE_MODE = 0o666 & ~_UMASK
+
+# Branding placeholders in report HTML, replaced in a single scan
+_PLACEHOLDER_RE = re.compile(
+    r'\{\{(COMPANY_NAME|LOGO_URL|PRIMARY_COLOR|SECONDARY_COLOR|ACCENT_COLOR'
+    r'|FONT_FAMILY|FOOTER_TEXT|CUSTOM_CSS|POWERED_BY)\}\}'
+)
 
 class WhiteLabelService:
     """Service for managing white label configurations"""
     
     def __init__(self):
-        self.config_file = "white_label_configs.json"
+        # One JSON file per configuration, plus an index of config ids by user
+        self.config_dir = "white_label_configs"
+        self.legacy_config_file = "white_label_configs.json"
+        self.user_index_file = os.path.join(self.config_dir, "user_index.json")
+        self.user_index_lock_file = os.path.join(self.config_dir, "user_index.lock")
         self.upload_dir = "uploads/logos"
+        # Parsed JSON files by path, reused until a file's inode, mtime or size changes; every
+        # write goes through os.replace, so a rewrite within one mtime tick still gets a new inode
+        self._file_cache: Dict[str, Tuple[tuple, Any]] = {}
+        # Reentrant: index updates hold it (through _index_lock) across their own file reads and writes
+        self._lock = threading.RLock()
         self._ensure_directories()
+        self._migrate_legacy_file()
     
     def _ensure_directories(self):
         """Ensure required directories exist"""
         os.makedirs(self.upload_dir, exist_ok=True)
+        os.makedirs(self.config_dir, exist_ok=True)
     
-    def _load_configs(self) -> Dict[str, Any]:
-        """Load configurations from file"""
-        if not os.path.exists(self.config_file):
-            return {}
+    def _migrate_legacy_file(self):
+        """Split the old single white_label_configs.json into per-config files"""
+        if not os.path.exists(self.legacy_config_file) or os.path.exists(self.user_index_file):
+            return
         
+        with self._index_lock():
+            # Another worker may have migrated it while we waited for the lock
+            if os.path.exists(self.user_index_file):
+                return
+            
+            configs = self._read_json(self.legacy_config_file) or {}
+            user_index: Dict[str, List[int]] = {}
+            for config_id, config_data in configs.items():
+                self._write_json(self._config_path(config_id), config_data)
+                user_index.setdefault(str(config_data.get('user_id')), []).append(int(config_id))
+            self._write_json(self.user_index_file, user_index)
+    
+    @contextmanager
+    def _index_lock(self):
+        """Hold the user index for a read-modify-write, across threads and worker processes"""
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            
+            with open(self.user_index_lock_file, 'a') as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+    
+    def _config_path(self, config_id) -> str:
+        """Path of a configuration's JSON file"""
+        return os.path.join(self.config_dir, f"{config_id}.json")
+    
+    def _read_json(self, path: str) -> Optional[Any]:
+        """Read a JSON file, re-parsing it only when it has changed; None if missing or invalid"""
         try:
-            with open(self.config_file, 'r') as f:
-                return json.load(f)
-        except (json.JSONDecodeError, FileNotFoundError):
-            return {}
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        stamp = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        
+        with self._lock:
+            cached = self._file_cache.get(path)
+            if cached and cached[0] == stamp:
+                return cached[1]
+        
+        try:
+            with open(path, 'rb') as f:
+                data = orjson.loads(f.read()) if orjson else json.load(f)
+        except (ValueError, FileNotFoundError):
+            return None
+        
+        with self._lock:
+            self._file_cache[path] = (stamp, data)
+        return data
+    
+    def _write_json(self, path: str, data: Any):
+        """Write a JSON file, replacing it atomically"""
+        tmp_file = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_file, 'wb') as f:
+            if orjson:
+                f.write(orjson.dumps(data, default=str, option=orjson.OPT_INDENT_2))
+            else:
+                f.write(json.dumps(data, indent=2, default=str).encode('utf-8'))
+        os.replace(tmp_file, path)
+        
+        stat = os.stat(path)
+        with self._lock:
+            self._file_cache[path] = ((stat.st_ino, stat.st_mtime_ns, stat.st_size), data)
+    
+    def _load_user_index(self) -> Dict[str, List[int]]:
+        """Load a copy of the user_id -> config ids index"""
+        return {user_id: list(config_ids) for user_id, config_ids in (self._read_json(self.user_index_file) or {}).items()}
     
-    def _save_configs(self, configs: Dict[str, Any]):
-        """Save configurations to file"""
-        with open(self.config_file, 'w') as f:
-            json.dump(configs, f, indent=2, default=str)
+    def _next_config_id(self) -> int:
+        """Next free configuration ID, from the config file names"""
+        config_ids = [
+            int(entry.name[:-5]) for entry in os.scandir(self.config_dir)
+            if entry.name.endswith('.json') and entry.name[:-5].isdigit()
+        ]
+        return max(config_ids + [0]) + 1
+    
+    def _claim_config_id(self) -> int:
+        """Reserve the next free configuration ID by creating its file; O_EXCL makes the claim
+        atomic across worker processes, and an ID another worker took first is skipped"""
+        while True:
+            config_id = self._next_config_id()
+            try:
+                os.close(os.open(self._config_path(config_id), os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o666))
+            except FileExistsError:
+                continue
+            return config_id
     
     def create_config(self, user_id: int, config_data: Dict[str, Any]) -> WhiteLabelConfig:
         """Create a new white label configuration"""
-        configs = self._load_configs()
-        
-        # Generate new ID
-        config_id = max([int(k) for k in configs.keys()] + [0]) + 1
-        
         # Create configuration
         config = WhiteLabelConfig.from_dict(config_data)
-        config.id = config_id
         config.user_id = user_id
         config.created_at = datetime.now()
         config.updated_at = datetime.now()
@@ -51,45 +169,57 @@ class WhiteLabelService:
         if errors:
             raise ValueError(f"Configuration validation failed: {errors}")
         
-        # Save configuration
-        configs[str(config_id)] = config.to_dict()
-        self._save_configs(configs)
+        # Generate new ID and save the configuration and its index entry
+        config.id = self._claim_config_id()
+        self._write_json(self._config_path(config.id), config.to_dict())
+        
+        with self._index_lock():
+            user_index = self._load_user_index()
+            user_index.setdefault(str(user_id), []).append(config.id)
+            self._write_json(self.user_index_file, user_index)
         
         return config
     
     def get_config(self, config_id: int) -> Optional[WhiteLabelConfig]:
         """Get configuration by ID"""
-        configs = self._load_configs()
-        config_data = configs.get(str(config_id))
+        config_data = self._read_json(self._config_path(int(config_id)))
         
         if not config_data:
             return None
         
-        return WhiteLabelConfig.from_dict(config_data)
+        return self._config_from_stored(config_data)
+    
+    def _config_from_stored(self, config_data: Dict[str, Any]) -> WhiteLabelConfig:
+        """Build a config from cached file data, copying its nested dicts so callers can't mutate the cache"""
+        config = WhiteLabelConfig.from_dict(config_data)
+        config.contact_info = dict(config.contact_info)
+        config.social_links = dict(config.social_links)
+        return config
     
     def get_user_config(self, user_id: int) -> Optional[WhiteLabelConfig]:
         """Get configuration for a specific user"""
-        configs = self._load_configs()
+        config_ids = (self._read_json(self.user_index_file) or {}).get(str(user_id))
         
-        for config_data in configs.values():
-            if config_data.get('user_id') == user_id:
-                return WhiteLabelConfig.from_dict(config_data)
+        if not config_ids:
+            return None
         
-        return None
+        return self.get_config(config_ids[0])
     
     def update_config(self, config_id: int, config_data: Dict[str, Any]) -> Optional[WhiteLabelConfig]:
         """Update an existing configuration"""
-        configs = self._load_configs()
+        config_id = int(config_id)
+        stored_config = self._read_json(self._config_path(config_id))
         
-        if str(config_id) not in configs:
+        if not stored_config:
             return None
         
         # Get existing config
-        existing_config = WhiteLabelConfig.from_dict(configs[str(config_id)])
+        existing_config = self._config_from_stored(stored_config)
+        previous_user_id = existing_config.user_id
         
         # Update fields
         for key, value in config_data.items():
-            if hasattr(existing_config, key):
+            if key in CONFIG_FIELDS:
                 setattr(existing_config, key, value)
         
         existing_config.updated_at = datetime.now()
@@ -100,49 +230,87 @@ class WhiteLabelService:
             raise ValueError(f"Configuration validation failed: {errors}")
         
         # Save updated configuration
-        configs[str(config_id)] = existing_config.to_dict()
-        self._save_configs(configs)
+        self._write_json(self._config_path(config_id), existing_config.to_dict())
+        
+        # Move the index entry if the configuration changed owner
+        if existing_config.user_id != previous_user_id:
+            with self._index_lock():
+                user_index = self._load_user_index()
+                self._remove_from_index(user_index, previous_user_id, config_id)
+                user_index.setdefault(str(existing_config.user_id), []).append(config_id)
+                user_index[str(existing_config.user_id)].sort()
+                self._write_json(self.user_index_file, user_index)
         
         return existing_config
     
+    def _remove_from_index(self, user_index: Dict[str, List[int]], user_id, config_id: int):
+        """Drop a config id from a user's index entry"""
+        config_ids = user_index.get(str(user_id), [])
+        if config_id in config_ids:
+            config_ids.remove(config_id)
+        if not config_ids:
+            user_index.pop(str(user_id), None)
+    
     def delete_config(self, config_id: int) -> bool:
         """Delete a configuration"""
-        configs = self._load_configs()
+        config_id = int(config_id)
+        config_data = self._read_json(self._config_path(config_id))
         
-        if str(config_id) not in configs:
+        if config_data is None:
             return False
         
         # Remove logo file if exists
-        config_data = configs[str(config_id)]
         if config_data.get('logo_url'):
             logo_path = config_data['logo_url'].replace('/uploads/', '')
             full_path = os.path.join(self.upload_dir, logo_path)
             if os.path.exists(full_path):
                 os.remove(full_path)
         
-        # Remove configuration
-        del configs[str(config_id)]
-        self._save_configs(configs)
+        # Remove configuration and its index entry
+        os.remove(self._config_path(config_id))
+        with self._lock:
+            self._file_cache.pop(self._config_path(config_id), None)
+        
+        with self._index_lock():
+            user_index = self._load_user_index()
+            self._remove_from_index(user_index, config_data.get('user_id'), config_id)
+            self._write_json(self.user_index_file, user_index)
         
         return True
     
-    def upload_logo(self, config_id: int, file_data: bytes, filename: str) -> str:
-        """Upload logo file and return URL"""
+    def upload_logo(self, config_id: int, file_data: Union[BinaryIO, bytes], filename: str) -> str:
+        """Upload logo file and return URL; file_data is a file-like object (e.g. a FileStorage) or bytes"""
         # Validate file type
-        allowed_extensions = {'.png', '.jpg', '.jpeg', '.svg', '.gif'}
         file_ext = os.path.splitext(filename)[1].lower()
         
-        if file_ext not in allowed_extensions:
-            raise ValueError(f"Invalid file type. Allowed: {', '.join(allowed_extensions)}")
+        if file_ext not in _ALLOWED_LOGO_EXTENSIONS:
+            raise ValueError(_INVALID_LOGO_MESSAGE)
         
-        # Generate unique filename
-        timestamp = int(datetime.now().timestamp())
-        safe_filename = f"logo_{config_id}_{timestamp}{file_ext}"
-        file_path = os.path.join(self.upload_dir, safe_filename)
+        if isinstance(file_data, (bytes, bytearray)):
+            file_data = io.BytesIO(file_data)
         
-        # Save file
-        with open(file_path, 'wb') as f:
-            f.write(file_data)
+        # Copy to a temp file in chunks, hashing as we go; the content hash names the file
+        digest = hashlib.blake2b(digest_size=16)
+        fd, tmp_path = tempfile.mkstemp(dir=self.upload_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                os.fchmod(f.fileno(), _UPLOAD_FILE_MODE)
+                for chunk in iter(lambda: file_data.read(64 * 1024), b''):
+                    digest.update(chunk)
+                    f.write(chunk)
+            
+            safe_filename = f"logo_{config_id}_{digest.hexdigest()}{file_ext}"
+            file_path = os.path.join(self.upload_dir, safe_filename)
+            
+            # An identical logo for this config is already stored
+            if os.path.exists(file_path):
+                os.remove(tmp_path)
+            else:
+                os.replace(tmp_path, file_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
         
         # Return URL
         return f"/uploads/logos/{safe_filename}"
@@ -159,22 +327,19 @@ class WhiteLabelService:
         """Apply white label branding to HTML content"""
         # Replace placeholders with actual values
         replacements = {
-            '{{COMPANY_NAME}}': config.company_name,
-            '{{LOGO_URL}}': config.logo_url,
-            '{{PRIMARY_COLOR}}': config.primary_color,
-            '{{SECONDARY_COLOR}}': config.secondary_color,
-            '{{ACCENT_COLOR}}': config.accent_color,
-            '{{FONT_FAMILY}}': config.font_family,
-            '{{FOOTER_TEXT}}': config.footer_text,
-            '{{CUSTOM_CSS}}': config.get_css_variables(),
-            '{{POWERED_BY}}': '' if not config.show_powered_by else 'Powered by SEO Analyzer Pro'
+            'COMPANY_NAME': config.company_name,
+            'LOGO_URL': config.logo_url,
+            'PRIMARY_COLOR': config.primary_color,
+            'SECONDARY_COLOR': config.secondary_color,
+            'ACCENT_COLOR': config.accent_color,
+            'FONT_FAMILY': config.font_family,
+            'FOOTER_TEXT': config.footer_text,
+            'CUSTOM_CSS': config.get_css_variables(),
+            'POWERED_BY': '' if not config.show_powered_by else 'Powered by SEO Analyzer Pro'
         }
+        replacements = {name: str(value) for name, value in replacements.items()}
         
-        branded_html = html_content
-        for placeholder, value in replacements.items():
-            branded_html = branded_html.replace(placeholder, str(value))
-        
-        return branded_html
+        return _PLACEHOLDER_RE.sub(lambda match: replacements[match.group(1)], html_content)
     
     def generate_preview_config(self, config_data: Dict[str, Any]) -> Dict[str, Any]:
         """Generate preview configuration for testing"""